@@ -1,5 +1,24 @@
 import os
+import sys
 from dotenv import load_dotenv
 
+# The paths on the command line are relative to where the command was run
+args = [os.path.abspath(a) for a in sys.argv[1:]]
 os.chdir(os.path.dirname(os.path.abspath(__file__)))
 load_dotenv()
+
+# The engine reads the java path when it is imported, so the environment has to be loaded first
+from src.engine.el_engine import ElEngine
+from src.teacher.teacher_impl import OwlTeacher
+from src.learner.learner_impl import LearnerImpl
+from src.learner.instrumentation import Instrumentation
+
+if __name__ == "__main__":
+    path = args[0] if len(args) > 0 else "example/animals.owl"
+    report = Instrumentation(args[1]) if len(args) > 1 else None
+
+    teacher = OwlTeacher.load(path)
+    learner = LearnerImpl(ElEngine(), teacher, instrumentation=report)
+
+    for axiom in learner.run_learner():
+        print(f"{axiom.left.canonical()} ⊑ {axiom.right.canonical()}")
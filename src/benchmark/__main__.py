@@ -0,0 +1,35 @@
+import argparse
+import os
+import sys
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# The engine reads the java path when it is imported, so the environment has to be loaded first
+from src.benchmark.harness import CASES, ENGINES, TEACHERS, compare, load_baseline, run_benchmark, save_baseline
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Learns generated EL ontologies and compares the runs with a baseline.")
+    parser.add_argument("--cases", nargs="+", default=[c.name for c in CASES], choices=[c.name for c in CASES])
+    parser.add_argument("--engines", nargs="+", default=["el"], choices=list(ENGINES))
+    parser.add_argument("--teachers", nargs="+", default=["owl", "cached"], choices=list(TEACHERS))
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    cases = [c for c in CASES if c.name in args.cases]
+    results = run_benchmark(cases, args.engines, args.teachers)
+
+    for r in results:
+        print(f"{r.key:24} {r.seconds:8.3f}s {r.peak_memory / 2**20:8.1f}MiB {r.membership_queries:7} MQ {r.equivalence_queries:5} EQ {r.entailment_checks:7} entails")
+
+    if args.update:
+        save_baseline(results, args.baseline)
+        sys.exit(0)
+
+    regressions = compare(results, load_baseline(args.baseline))
+    for regression in regressions:
+        print("REGRESSION", regression)
+    sys.exit(1 if len(regressions) > 0 else 0)
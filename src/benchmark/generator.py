@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List
+import random
+
+import owlready2
+from owlready2 import Ontology
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, Edge, Node, Role
+from src.engine.engine_impl import OwlEngine
+
+@dataclass
+class GeneratorConfig:
+    """The shape of a generated EL terminology.
+
+    concepts and roles are the size of the signature, axioms the number of terminologies, depth how
+    deep the complex expressions can nest, fan_out the most edges a node can have, and left_ratio
+    the part of the axioms that are left terminologies (C ⊑ A) instead of right terminologies (A ⊑ C).
+    """
+    concepts: int = 10
+    roles: int = 2
+    axioms: int = 10
+    depth: int = 2
+    fan_out: int = 2
+    left_ratio: float = 0.3
+    seed: int = 0
+
+def generate_terminology(config: GeneratorConfig) -> List[RightTerminology | LeftTerminology]:
+    """Generates random EL terminologies.
+
+    The concepts are numbered, and every axiom goes from lower to higher numbers: the expression
+    of a right terminology about concept i only uses concepts after i, and the expression of a
+    left terminology only concepts before i. The terminology is therefore acyclic.
+
+    Args:
+        config (GeneratorConfig): The shape of the terminology
+
+    Returns:
+        List[RightTerminology | LeftTerminology]: The axioms
+    """
+    rng = random.Random(config.seed)
+    concepts = [ConceptExpression(f"Concept{i}") for i in range(config.concepts)]
+    roles = [Role(f"role{i}") for i in range(config.roles)]
+
+    axioms: List[RightTerminology | LeftTerminology] = []
+    for _ in range(config.axioms):
+        if rng.random() < config.left_ratio:
+            i = rng.randrange(1, config.concepts)
+            axioms.append(LeftTerminology(_random_node(rng, config, concepts[:i], roles, config.depth), concepts[i]))
+        else:
+            i = rng.randrange(config.concepts - 1)
+            axioms.append(RightTerminology(concepts[i], _random_node(rng, config, concepts[i + 1:], roles, config.depth)))
+    return axioms
+
+def generate_ontology(config: GeneratorConfig, iri: str) -> Ontology:
+    """Generates a random EL terminology as an owlready2 ontology.
+
+    Args:
+        config (GeneratorConfig): The shape of the terminology
+        iri (str): The IRI of the ontology
+
+    Returns:
+        Ontology: The ontology
+    """
+    ontology = owlready2.get_ontology(iri)
+    engine = OwlEngine(ontology)
+    for c in range(config.concepts):
+        engine._concept_convert(ConceptExpression(f"Concept{c}"))
+    for axiom in generate_terminology(config):
+        engine.add_axiom(axiom)
+    return ontology
+
+def save_ontology(config: GeneratorConfig, path: str) -> None:
+    """Generates a random EL terminology and saves it as an OWL file.
+
+    Args:
+        config (GeneratorConfig): The shape of the terminology
+        path (str): Where the file is saved
+    """
+    ontology = generate_ontology(config, f"http://generated.org/{config.seed}/onto.owl")
+    ontology.save(path)
+    ontology.destroy()
+
+def _random_node(rng: random.Random, config: GeneratorConfig, concepts: List[ConceptExpression], roles: List[Role], depth: int) -> Node:
+    labels = rng.sample(concepts, min(len(concepts), rng.randint(0, 2)))
+    edges: List[Edge] = []
+    if depth > 0:
+        for _ in range(rng.randint(0, config.fan_out)):
+            edges.append(Edge(rng.choice(roles), _random_node(rng, config, concepts, roles, depth - 1)))
+
+    # An empty node is ⊤, which would make the axiom trivial
+    if len(labels) == 0 and len(edges) == 0:
+        if len(concepts) > 0:
+            labels.append(rng.choice(concepts))
+        else:
+            edges.append(Edge(rng.choice(roles), Node([], [])))
+    return Node(labels, edges)
@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+import json
+import os
+import tempfile
+import tracemalloc
+
+import owlready2
+
+from src.benchmark.generator import GeneratorConfig, save_ontology
+from src.engine.engine import Engine
+from src.engine.el_engine import ElEngine
+from src.engine.engine_impl import OwlEngine
+from src.engine.structural import StructuralEngine
+from src.learner.instrumentation import Instrumentation
+from src.learner.learner_impl import LearnerImpl
+from src.teacher.teacher import Teacher
+from src.teacher.teacher_impl import OwlTeacher
+from src.teacher.cache import CachingTeacher
+from src.teacher.pool import PoolTeacher
+
+HYPOTHESIS_IRI = "http://benchmark.org/hypothesis.owl"
+
+ENGINES: Dict[str, Callable[[], Engine]] = {
+    "el": ElEngine,
+    "owl": lambda: OwlEngine(owlready2.get_ontology(HYPOTHESIS_IRI)),
+    "structural-el": lambda: StructuralEngine(ElEngine(), closed=True),
+    "structural-owl": lambda: StructuralEngine(OwlEngine(owlready2.get_ontology(HYPOTHESIS_IRI)), closed=True),
+}
+
+TEACHERS: Dict[str, Callable[[str], Teacher]] = {
+    "owl": OwlTeacher.load,
+    "cached": lambda path: CachingTeacher(OwlTeacher.load(path)),
+    "pool": lambda path: PoolTeacher(path, processes=2),
+}
+
+@dataclass
+class BenchmarkCase:
+    name: str
+    config: GeneratorConfig
+
+CASES: List[BenchmarkCase] = [
+    BenchmarkCase("small", GeneratorConfig(concepts=10, roles=2, axioms=10, seed=0)),
+    BenchmarkCase("medium", GeneratorConfig(concepts=30, roles=3, axioms=40, seed=1)),
+    BenchmarkCase("deep", GeneratorConfig(concepts=20, roles=2, axioms=20, depth=4, fan_out=2, seed=2)),
+    BenchmarkCase("left", GeneratorConfig(concepts=20, roles=3, axioms=30, left_ratio=0.7, seed=3)),
+]
+
+# The measurements kept in the baseline. Time and memory depend on the machine, so they are only printed.
+COUNTS = ["membership_queries", "equivalence_queries", "entailment_checks", "hypothesis_size"]
+
+@dataclass
+class BenchmarkResult:
+    case: str
+    engine: str
+    teacher: str
+    seconds: float
+    peak_memory: int
+    membership_queries: int
+    equivalence_queries: int
+    entailment_checks: int
+    hypothesis_size: int
+
+    @property
+    def key(self) -> str:
+        return f"{self.case}/{self.engine}/{self.teacher}"
+
+def run_case(case: BenchmarkCase, engine: str, teacher: str, directory: str) -> BenchmarkResult:
+    """Learns the target of a case with one engine and teacher, and measures the run.
+
+    The peak memory is measured with tracemalloc, which also slows down the run, so times are only
+    comparable between runs of the harness.
+
+    Args:
+        case (BenchmarkCase): The case
+        engine (str): The name of the engine in ENGINES
+        teacher (str): The name of the teacher in TEACHERS
+        directory (str): Where the target ontology is saved
+
+    Returns:
+        BenchmarkResult: The measurements
+    """
+    path = os.path.abspath(os.path.join(directory, f"{case.name}.owl"))
+    if not os.path.exists(path):
+        save_ontology(case.config, path)
+
+    target = TEACHERS[teacher](path)
+    hypothesis = ENGINES[engine]()
+    instrumentation = Instrumentation()
+
+    tracemalloc.start()
+    try:
+        learned = LearnerImpl(hypothesis, target, instrumentation=instrumentation).run_learner()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        for o in [target, hypothesis]:
+            if hasattr(o, "close"):
+                o.close() # type: ignore[close]
+        for iri in ["file://" + path, HYPOTHESIS_IRI]:
+            owlready2.default_world.get_ontology(iri).destroy()
+
+    report = instrumentation.report()
+    # The instrumentation counts the queries the learner asks. With a cache in front of the teacher,
+    # only the ones it could not answer reach the teacher.
+    membership_queries = target.misses if isinstance(target, CachingTeacher) else _count(report, "membership_query")
+    return BenchmarkResult(
+        case.name, engine, teacher,
+        seconds=report["seconds"],
+        peak_memory=peak,
+        membership_queries=membership_queries,
+        equivalence_queries=_count(report, "equivalence_query", "calls"),
+        entailment_checks=_count(report, "entails"),
+        hypothesis_size=len(learned),
+    )
+
+def run_benchmark(cases: List[BenchmarkCase], engines: List[str], teachers: List[str]) -> List[BenchmarkResult]:
+    """Runs every case with every combination of engine and teacher.
+
+    Args:
+        cases (List[BenchmarkCase]): The cases
+        engines (List[str]): The names of the engines
+        teachers (List[str]): The names of the teachers
+
+    Returns:
+        List[BenchmarkResult]: The measurements
+    """
+    results: List[BenchmarkResult] = []
+    with tempfile.TemporaryDirectory() as directory:
+        for case in cases:
+            for engine in engines:
+                for teacher in teachers:
+                    results.append(run_case(case, engine, teacher, directory))
+    return results
+
+def compare(results: List[BenchmarkResult], baseline: Dict[str, Dict[str, int]]) -> List[str]:
+    """Compares the query counts of measurements with a baseline. The counts are deterministic, so
+    any increase is a regression.
+
+    Args:
+        results (List[BenchmarkResult]): The measurements
+        baseline (Dict[str, Dict[str, int]]): The counts of the baseline, by the key of the result
+
+    Returns:
+        List[str]: A description of every regression
+    """
+    regressions: List[str] = []
+    for result in results:
+        if result.key not in baseline:
+            continue
+        base = baseline[result.key]
+        for field in ["membership_queries", "equivalence_queries", "entailment_checks"]:
+            if getattr(result, field) > base[field]:
+                regressions.append(f"{result.key}: {field} went from {base[field]} to {getattr(result, field)}")
+    return regressions
+
+def load_baseline(path: str) -> Dict[str, Dict[str, int]]:
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def save_baseline(results: List[BenchmarkResult], path: str) -> None:
+    with open(path, "w") as f:
+        json.dump({r.key: {field: getattr(r, field) for field in COUNTS} for r in results}, f, indent=2)
+
+def _count(report: Dict[str, Any], operation: str, stat: str = "items") -> int:
+    return sum(p["operations"][operation][stat] for p in report["phases"].values() if operation in p["operations"])
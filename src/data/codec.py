@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from src.data.communication import ConceptExpression, Edge, InclusionAxiom, Node, Role
+from src.data.symbols import SymbolTable
+
+"""
+A compact binary encoding of expressions, for sending them between processes.
+
+Integers are unsigned LEB128 varints. Concepts and roles are written as ids from a SymbolTable. The
+first time a symbol is written its name follows the id, so the reader can build the same table. A
+writer and a reader therefore have to be used as a pair, for one direction of one connection.
+
+A node is written in preorder: the number of labels and the labels, then the number of edges and
+for each edge the role and the target node.
+"""
+
+def write_varint(buffer: bytearray, value: int) -> None:
+    while value >= 0x80:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+def read_varint(data: bytes | bytearray | memoryview, offset: int) -> Tuple[int, int]:
+    """Reads a varint.
+
+    Args:
+        data (bytes | bytearray | memoryview): The data
+        offset (int): Where the varint starts
+
+    Returns:
+        Tuple[int, int]: The value, and the offset after it
+    """
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+class Writer:
+    """Encodes expressions into a buffer.
+    """
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self.buffer = bytearray()
+
+    def take(self) -> bytes:
+        """Gives the encoded bytes, and empties the buffer.
+        """
+        data = bytes(self.buffer)
+        self.buffer.clear()
+        return data
+
+    def varint(self, value: int) -> None:
+        write_varint(self.buffer, value)
+
+    def concept(self, concept: ConceptExpression) -> None:
+        new = concept not in self.symbols.concept_ids
+        self.varint(self.symbols.concept_id(concept))
+        if new:
+            self._name(concept.name)
+
+    def role(self, role: Role) -> None:
+        new = role not in self.symbols.role_ids
+        self.varint(self.symbols.role_id(role))
+        if new:
+            self._name(role.name)
+
+    def node(self, node: Node) -> None:
+        self.varint(len(node.labels))
+        for c in node.labels:
+            self.concept(c)
+        self.varint(len(node.edges))
+        for e in node.edges:
+            self.role(e.label)
+            self.node(e.target)
+
+    def axiom(self, axiom: InclusionAxiom) -> None:
+        self.node(axiom.left)
+        self.node(axiom.right)
+
+    def bools(self, values: List[bool]) -> None:
+        """Writes a list of booleans as a bitset.
+        """
+        self.varint(len(values))
+        for i in range(0, len(values), 8):
+            byte = 0
+            for j, value in enumerate(values[i:i + 8]):
+                if value:
+                    byte |= 1 << j
+            self.buffer.append(byte)
+
+    def _name(self, name: str) -> None:
+        data = name.encode("utf-8")
+        self.varint(len(data))
+        self.buffer.extend(data)
+
+class Reader:
+    """Decodes expressions written by a Writer. Call `feed` with the data of each message before
+    reading from it.
+    """
+    def __init__(self):
+        self.symbols = SymbolTable()
+        self.data: bytes | bytearray | memoryview = b""
+        self.offset = 0
+
+    def feed(self, data: bytes | bytearray | memoryview) -> None:
+        self.data = data
+        self.offset = 0
+
+    def varint(self) -> int:
+        value, self.offset = read_varint(self.data, self.offset)
+        return value
+
+    def byte(self) -> int:
+        self.offset += 1
+        return self.data[self.offset - 1]
+
+    def concept(self) -> ConceptExpression:
+        i = self.varint()
+        if i == len(self.symbols.concepts):
+            self.symbols.concept_id(ConceptExpression(self._name()))
+        return self.symbols.concepts[i]
+
+    def role(self) -> Role:
+        i = self.varint()
+        if i == len(self.symbols.roles):
+            self.symbols.role_id(Role(self._name()))
+        return self.symbols.roles[i]
+
+    def node(self) -> Node:
+        labels = [self.concept() for _ in range(self.varint())]
+        edges: List[Edge] = []
+        for _ in range(self.varint()):
+            role = self.role()
+            edges.append(Edge(role, self.node()))
+        return Node(labels, edges)
+
+    def axiom(self) -> InclusionAxiom:
+        left = self.node()
+        return InclusionAxiom(left, self.node())
+
+    def bools(self) -> List[bool]:
+        count = self.varint()
+        values: List[bool] = []
+        for i in range(0, count, 8):
+            byte = self.byte()
+            values.extend(bool(byte >> j & 1) for j in range(min(8, count - i)))
+        return values
+
+    def _name(self) -> str:
+        length = self.varint()
+        self.offset += length
+        return bytes(self.data[self.offset - length:self.offset]).decode("utf-8")
@@ -1,9 +1,9 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-from typing import List, Dict
-
-from collections import defaultdict
+from typing import Iterable, List, Tuple
+from weakref import WeakValueDictionary
+import threading
 """
 These are the data types that the learner and teacher uses when they communicate.
 The axioms are build from two trees.
@@ -30,6 +30,14 @@ class InclusionAxiom:
     """
     left: Node
     right: Node
+    
+    def canonical(self) -> Tuple[CanonicalNode, CanonicalNode]:
+        """Gives the canonical form of the axiom, which can be used as a key.
+
+        Returns:
+            Tuple[CanonicalNode, CanonicalNode]: The canonical form of the left and right side
+        """
+        return (self.left.canonical(), self.right.canonical())
 
 @dataclass
 class Node:
@@ -51,42 +59,109 @@ class Node:
     labels: List[ConceptExpression]
     edges: List[Edge]
     
-    def _group_by_role_name(self, edges: List[Edge]) -> Dict[Role, List[Edge]]:
-        grouped = defaultdict(list)
-        for item in edges:
-            grouped[item.label].append(item)
-        return grouped
-    
     def __iter__(self):
         return NodeIterator(self)
     
     def __eq__(self, value: object) -> bool:
+        """Nodes are equal if they have the same canonical form. Both canonical forms are built for
+        every comparison, which takes time linear in the size of the trees, since nodes can change.
+        When a node is compared many times, compare its canonical form instead.
+        """
         if not isinstance(value, Node):
             return False
         
-        if set(value.labels) != set(self.labels):
-            return False
-        
-        if len(value.edges) != len(self.edges):
-            return False
-        
-        # This part is not the best way of doing it, but it works.
-        grouped = self._group_by_role_name(value.edges)
+        return self.canonical() is value.canonical()
+    
+    def canonical(self) -> CanonicalNode:
+        """Gives the canonical form of the expression. Expressions that only differ in the order
+        of their labels and edges have the same canonical form.
+
+        Returns:
+            CanonicalNode: The canonical form
+        """
+        return CanonicalNode.make(self.labels, [(e.label, e.target.canonical()) for e in self.edges])
+
+
+class CanonicalNode:
+    """An immutable normal form of a Node. The labels are sorted and without duplicates, and the
+    edges are sorted by role and target.
+    
+    Canonical nodes are interned, meaning identical expressions are the same object. Equality is
+    therefore an identity check, and the hash is computed once. This makes them usable as keys
+    when caching answers about expressions. Interning is guarded by a lock, so threads that make
+    the same expression get the same object.
+    
+    Canonical nodes should be made with `Node.canonical` or `CanonicalNode.make`.
+    """
+    __slots__ = ("labels", "edges", "text", "_hash", "__weakref__")
+    
+    _interned: WeakValueDictionary[Tuple, CanonicalNode] = WeakValueDictionary()
+    _lock = threading.Lock()
+    
+    labels: Tuple[ConceptExpression, ...]
+    edges: Tuple[Tuple[Role, CanonicalNode], ...]
+    text: str
+    _hash: int
+    
+    @staticmethod
+    def make(labels: Iterable[ConceptExpression], edges: Iterable[Tuple[Role, CanonicalNode]]) -> CanonicalNode:
+        """Gets the interned canonical node with the given labels and edges.
+
+        Args:
+            labels (Iterable[ConceptExpression]): The labels of the node
+            edges (Iterable[Tuple[Role, CanonicalNode]]): The edges of the node, as role and target
+
+        Returns:
+            CanonicalNode: The canonical node
+        """
+        sorted_labels = tuple(sorted(set(labels), key=lambda c: c.name))
+        sorted_edges = tuple(sorted(edges, key=lambda e: (e[0].name, e[1].text)))
+        key = (sorted_labels, sorted_edges)
         
-        for r in self.edges:
-            found = False
-            l = grouped[r.label]
-            for i in l:
-                if r.target == i.target:
-                    found = True
-                    break
-            if not found:
-                return False
+        with CanonicalNode._lock:
+            node = CanonicalNode._interned.get(key)
+            if node is None:
+                node = object.__new__(CanonicalNode)
+                node.labels = sorted_labels
+                node.edges = sorted_edges
+                node.text = CanonicalNode._to_text(sorted_labels, sorted_edges)
+                node._hash = hash(key)
+                CanonicalNode._interned[key] = node
+        return node
+    
+    @staticmethod
+    def _to_text(labels: Tuple[ConceptExpression, ...], edges: Tuple[Tuple[Role, CanonicalNode], ...]) -> str:
+        parts = [c.name for c in labels]
+        for r, t in edges:
+            if len(t.labels) + len(t.edges) <= 1:
+                parts.append(f"∃{r.name}.{t.text}")
+            else:
+                parts.append(f"∃{r.name}.({t.text})")
         
-        return True
+        if len(parts) == 0:
+            return "⊤"
+        return " ⊓ ".join(parts)
     
+    def to_node(self) -> Node:
+        """Converts the canonical node back into a Node.
+
+        Returns:
+            Node: A new Node
+        """
+        return Node(list(self.labels), [Edge(r, t.to_node()) for r, t in self.edges])
+    
+    def __hash__(self) -> int:
+        return self._hash
+    
+    def __eq__(self, value: object) -> bool:
+        return self is value
+    
+    def __repr__(self) -> str:
+        return f"CanonicalNode({self.text})"
+    
+    def __str__(self) -> str:
+        return self.text
     
-        
 
 class NodeIterator:
     """    
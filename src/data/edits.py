@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from typing import List, Tuple
+
+from src.data.communication import ConceptExpression, Edge, Node
+
+"""
+Tentative edits of Node trees. The learner often changes an expression, asks a query about it and
+changes it back if the answer is no. An EditLog makes the changes in place and remembers how to undo
+them, so the expression does not have to be copied first.
+"""
+
+ADD_LABEL = 0
+REMOVE_EDGE = 1
+REPLACE_EDGE = 2
+
+class EditLog:
+    """Changes nodes in place and records the changes in an undo log.
+
+    Take a `mark` before a group of edits, and then either `rollback` to the mark to undo them or
+    `commit` to keep them. Undoing an added label or a replaced edge takes constant time, while
+    removing an edge or putting it back shifts the edges after it, which is linear in the number of
+    edges of the node. The edits have to be undone in the reverse order they were made, so the
+    nodes should not be changed by other means in between.
+    """
+    def __init__(self):
+        self.undo: List[Tuple[int, Node, int, Edge | None]] = []
+
+    def mark(self) -> int:
+        """Gives a mark that the log can be rolled back to.
+
+        Returns:
+            int: The mark
+        """
+        return len(self.undo)
+
+    def add_label(self, node: Node, concept: ConceptExpression) -> None:
+        node.labels.append(concept)
+        self.undo.append((ADD_LABEL, node, len(node.labels) - 1, None))
+
+    def remove_edge(self, node: Node, index: int) -> Edge:
+        """Removes an edge of the node.
+
+        Args:
+            node (Node): The node
+            index (int): The index of the edge
+
+        Returns:
+            Edge: The removed edge
+        """
+        edge = node.edges.pop(index)
+        self.undo.append((REMOVE_EDGE, node, index, edge))
+        return edge
+
+    def replace_edge(self, node: Node, index: int, edge: Edge) -> None:
+        self.undo.append((REPLACE_EDGE, node, index, node.edges[index]))
+        node.edges[index] = edge
+
+    def rollback(self, mark: int = 0) -> None:
+        """Undoes every edit made after the mark.
+
+        Args:
+            mark (int, optional): A mark given by `mark`. Defaults to undoing every edit.
+        """
+        while len(self.undo) > mark:
+            operation, node, index, edge = self.undo.pop()
+            if operation == ADD_LABEL:
+                del node.labels[index]
+            elif operation == REMOVE_EDGE:
+                node.edges.insert(index, edge) # type: ignore[arg-type]
+            else:
+                node.edges[index] = edge # type: ignore[assignment]
+
+    def commit(self, mark: int = 0) -> None:
+        """Keeps every edit made after the mark. They can no longer be undone.
+
+        Args:
+            mark (int, optional): A mark given by `mark`. Defaults to keeping every edit.
+        """
+        del self.undo[mark:]
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Iterator, List
+
+from src.data.communication import ConceptExpression, Role
+
+"""
+Concept and role names interned to integer ids through a symbol table. The ids are used by the
+binary codec, and by label sets that store a set of labels as the bits of an integer, so membership,
+union and subset tests are integer operations.
+"""
+
+class SymbolTable:
+    """Gives every concept expression and role an integer id. One table should be used for a
+    whole session, so that ids from different expressions can be compared.
+    """
+    def __init__(self):
+        self.concept_ids: Dict[ConceptExpression, int] = {}
+        self.concepts: List[ConceptExpression] = []
+        self.role_ids: Dict[Role, int] = {}
+        self.roles: List[Role] = []
+
+    def concept_id(self, concept: ConceptExpression) -> int:
+        """Gets the id of a concept expression. The concept gets a new id if it does not have one.
+
+        Args:
+            concept (ConceptExpression): The concept expression
+
+        Returns:
+            int: The id
+        """
+        i = self.concept_ids.get(concept)
+        if i == None:
+            i = len(self.concepts)
+            self.concept_ids[concept] = i
+            self.concepts.append(concept)
+        return i
+
+    def role_id(self, role: Role) -> int:
+        """Gets the id of a role. The role gets a new id if it does not have one.
+
+        Args:
+            role (Role): The role
+
+        Returns:
+            int: The id
+        """
+        i = self.role_ids.get(role)
+        if i == None:
+            i = len(self.roles)
+            self.role_ids[role] = i
+            self.roles.append(role)
+        return i
+
+    def label_set(self, labels: Iterable[ConceptExpression] = ()) -> LabelSet:
+        """Makes a LabelSet with the given labels. The labels get new ids if they do not have one.
+
+        Args:
+            labels (Iterable[ConceptExpression], optional): The labels. Defaults to an empty set.
+
+        Returns:
+            LabelSet: The label set
+        """
+        bits = 0
+        for c in labels:
+            bits |= 1 << self.concept_id(c)
+        return LabelSet(self, bits)
+
+class LabelSet:
+    """A set of concept expressions stored as an integer, where bit i is set if the concept with id i
+    in the SymbolTable is in the set. Sets should only be combined with sets of the same table.
+
+    LabelSets should be made with `SymbolTable.label_set`.
+    """
+    __slots__ = ("table", "bits")
+
+    def __init__(self, table: SymbolTable, bits: int = 0):
+        self.table = table
+        self.bits = bits
+
+    def __contains__(self, concept: object) -> bool:
+        i = self.table.concept_ids.get(concept) # type: ignore[call-overload]
+        return i != None and (self.bits >> i) & 1 == 1
+
+    def add(self, concept: ConceptExpression) -> bool:
+        """Adds a concept to the set, if it does not have it already.
+
+        Args:
+            concept (ConceptExpression): The concept
+
+        Returns:
+            bool: True if the concept was added
+        """
+        bit = 1 << self.table.concept_id(concept)
+        if self.bits & bit:
+            return False
+        self.bits |= bit
+        return True
+
+    def discard(self, concept: ConceptExpression) -> None:
+        i = self.table.concept_ids.get(concept)
+        if i != None:
+            self.bits &= ~(1 << i)
+
+    def issubset(self, other: LabelSet) -> bool:
+        return self.bits & ~other.bits == 0
+
+    def __or__(self, other: LabelSet) -> LabelSet:
+        return LabelSet(self.table, self.bits | other.bits)
+
+    def __and__(self, other: LabelSet) -> LabelSet:
+        return LabelSet(self.table, self.bits & other.bits)
+
+    def __sub__(self, other: LabelSet) -> LabelSet:
+        return LabelSet(self.table, self.bits & ~other.bits)
+
+    def __le__(self, other: LabelSet) -> bool:
+        return self.issubset(other)
+
+    def __eq__(self, value: object) -> bool:
+        return isinstance(value, LabelSet) and value.table is self.table and value.bits == self.bits
+
+    def __hash__(self) -> int:
+        return hash(self.bits)
+
+    def __len__(self) -> int:
+        return self.bits.bit_count()
+
+    def __iter__(self) -> Iterator[ConceptExpression]:
+        """Iterates through the concepts in the order of their ids.
+        """
+        bits = self.bits
+        while bits:
+            low = bits & -bits
+            yield self.table.concepts[low.bit_length() - 1]
+            bits ^= low
+
+    def __repr__(self) -> str:
+        return "LabelSet({" + ", ".join(c.name for c in self) + "})"
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+from src.data.communication import ConceptExpression, InclusionAxiom, Node
+from src.engine.engine import Engine
+from src.teacher.teacher import Teacher
+
+class ConceptTaxonomy:
+    """The subsumptions between the concept expressions of an ontology.
+
+    Entailment is monotone, so the learner can use the taxonomy to skip candidates: if adding A to
+    an expression fails, adding anything below A fails as well, and if it succeeds, everything above
+    A is implied.
+
+    A taxonomy of the target can be given by the teacher. A taxonomy of the hypothesis can be used
+    as well, since every subsumption in the hypothesis also holds in the target.
+    """
+    def __init__(self, concepts: Iterable[ConceptExpression], subsumptions: Iterable[Tuple[ConceptExpression, ConceptExpression]]):
+        """
+        Args:
+            concepts (Iterable[ConceptExpression]): The concept expressions
+            subsumptions (Iterable[Tuple[ConceptExpression, ConceptExpression]]): Pairs (A, B) where A ⊑ B
+        """
+        self._subsumers: Dict[ConceptExpression, Set[ConceptExpression]] = {c: set() for c in concepts}
+        self._subsumees: Dict[ConceptExpression, Set[ConceptExpression]] = {c: set() for c in self._subsumers}
+
+        for a, b in subsumptions:
+            if a == b:
+                continue
+            self._subsumers.setdefault(a, set()).add(b)
+            self._subsumees.setdefault(b, set()).add(a)
+            self._subsumers.setdefault(b, set())
+            self._subsumees.setdefault(a, set())
+
+    def subsumers(self, concept: ConceptExpression) -> Set[ConceptExpression]:
+        """The concept expressions above the concept, not including itself.
+        """
+        return self._subsumers.get(concept, set())
+
+    def subsumees(self, concept: ConceptExpression) -> Set[ConceptExpression]:
+        """The concept expressions below the concept, not including itself.
+        """
+        return self._subsumees.get(concept, set())
+
+    def order(self, concepts: List[ConceptExpression]) -> List[ConceptExpression]:
+        """Orders concept expressions so the most general come first. A concept is then tried before
+        the concepts below it, which can be skipped if it fails.
+
+        Args:
+            concepts (List[ConceptExpression]): The concept expressions
+
+        Returns:
+            List[ConceptExpression]: The ordered concept expressions
+        """
+        return sorted(concepts, key=lambda c: len(self.subsumers(c)))
+
+    @staticmethod
+    def from_engine(engine: Engine, concepts: List[ConceptExpression]) -> ConceptTaxonomy:
+        """Computes the taxonomy of the engines ontology, with one batched entailment check.
+
+        Args:
+            engine (Engine): The engine
+            concepts (List[ConceptExpression]): The concept expressions
+
+        Returns:
+            ConceptTaxonomy: The taxonomy
+        """
+        pairs = [(a, b) for a in concepts for b in concepts if a != b]
+        entailed = engine.entails_many([InclusionAxiom(Node([a], []), Node([b], [])) for a, b in pairs])
+        return ConceptTaxonomy(concepts, [p for p, e in zip(pairs, entailed) if e])
+
+    @staticmethod
+    def from_teacher(teacher: Teacher) -> ConceptTaxonomy:
+        """Computes the taxonomy of the target, with one batch of membership queries.
+
+        Args:
+            teacher (Teacher): The teacher
+
+        Returns:
+            ConceptTaxonomy: The taxonomy
+        """
+        concepts = teacher.get_concepts()
+        pairs = [(a, b) for a in concepts for b in concepts if a != b]
+        members = teacher.membership_queries([InclusionAxiom(Node([a], []), Node([b], [])) for a, b in pairs])
+        return ConceptTaxonomy(concepts, [p for p, m in zip(pairs, members) if m])
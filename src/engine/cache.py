@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Hashable, List, Tuple
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, InclusionAxiom
+from src.engine.engine import Engine
+
+def axiom_key(axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> Tuple:
+    """Gives a canonical form of an axiom. Axioms that only differ in the order of labels and edges
+    get the same key, and terminologies get the same key as the inclusion axiom they stand for.
+
+    Args:
+        axiom (RightTerminology | LeftTerminology | InclusionAxiom): The axiom
+
+    Returns:
+        Tuple: The canonical form
+    """
+    if not isinstance(axiom, InclusionAxiom):
+        axiom = axiom.inclusion_axiom()
+    return axiom.canonical()
+
+@dataclass
+class CacheEntry:
+    entails: bool
+    version: int
+
+class EntailmentCache:
+    """
+    A bounded cache of entailment answers, where the least recently used entries are evicted first.
+    Each entry is tagged with the version of the hypothesis it was answered for.
+
+    The hypothesis only grows, so an axiom that was entailed stays entailed. Positive answers are
+    therefore valid for every later version, while negative answers are only valid for the version
+    they were answered for.
+    """
+    def __init__(self, max_size: int = 100_000):
+        self.max_size = max_size
+        self.entries: OrderedDict[Hashable, CacheEntry] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, version: int) -> bool | None:
+        """Gets a cached answer.
+
+        Args:
+            key (Hashable): The key of the axiom
+            version (int): The current version of the hypothesis
+
+        Returns:
+            bool | None: The answer. None if there is no valid answer for the version.
+        """
+        entry = self.entries.get(key)
+        if entry == None or (not entry.entails and entry.version != version):
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry.entails
+
+    def put(self, key: Hashable, version: int, entails: bool) -> None:
+        """Adds an answer to the cache.
+
+        Args:
+            key (Hashable): The key of the axiom
+            version (int): The version of the hypothesis the answer is for
+            entails (bool): The answer
+        """
+        self.entries[key] = CacheEntry(entails, version)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self.entries.clear()
+
+class CachingEngine:
+    """
+    Implementation of the Engine protocol that wraps another engine and caches its entailment answers.
+    Each call to `add_axiom` bumps the version of the hypothesis.
+    """
+    def __init__(self, engine: Engine, max_size: int = 100_000):
+        self.engine = engine
+        self.cache = EntailmentCache(max_size)
+        self.version = 0
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def entails(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool:
+        """The method should implement whether or not an axiom is entailed by the engines ontology.
+        The wrapped engine is only asked if there is no valid answer in the cache.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology | InclusionAxiom): The axiom to test
+
+        Returns:
+            bool: True if the axiom is entailed from the engines ontology
+        """
+        return self.entails_many([axiom])[0]
+
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms whether or not it is entailed by the engines ontology.
+        The axioms without a valid answer in the cache are sent to the wrapped engine as one list.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology | InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed from the engines ontology
+        """
+        keys = [axiom_key(a) for a in axioms]
+        answers = [self.cache.get(k, self.version) for k in keys]
+
+        missing = [i for i, a in enumerate(answers) if a == None]
+        if len(missing) > 0:
+            entails = self.engine.entails_many([axioms[i] for i in missing])
+            for i, e in zip(missing, entails):
+                self.cache.put(keys[i], self.version, e)
+                answers[i] = e
+
+        return [a == True for a in answers]
+
+    def add_axiom(self, axiom: RightTerminology | LeftTerminology):
+        """Adds an axiom to the wrapped engine and bumps the version of the hypothesis.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology): Axiom to be added
+        """
+        self.engine.add_axiom(axiom)
+        self.version += 1
+
+    def compact(self) -> None:
+        """Compacts the hypothesis of the wrapped engine. The hypothesis stays equivalent, so the
+        cached answers stay valid.
+        """
+        self.engine.compact()
+
+    def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
+        return self.engine.get_hypothesis()
+
+    def get_right_from_hypothesis(self, concept_expression: ConceptExpression) -> RightTerminology | None:
+        return self.engine.get_right_from_hypothesis(concept_expression)
@@ -0,0 +1,424 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+import copy
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import CanonicalNode, ConceptExpression, Node, InclusionAxiom, Role
+from src.engine.engine_impl import OntologyMap
+
+TOP = 0
+"""The internal name of ⊤. Every name in the completion is subsumed by it."""
+
+class Completion:
+    """
+    The completion graph of an EL ontology. It is built from normalized axioms and saturated
+    with the completion rules from the EL classification algorithm (Baader, Brandt, Lutz).
+
+    Every concept name (and every fresh name made during normalization) gets an integer id.
+    The normal forms are:
+
+        A ⊑ B,  A1 ⊓ ... ⊓ An ⊑ B,  A ⊑ ∃r.B,  ∃r.A ⊑ B
+
+    After saturation, `subsumers[X]` holds every name that subsumes X, and `successors[X][r]`
+    holds the names that X has an r link to. Together they form the canonical model of the
+    ontology, which is used to check if a name is subsumed by a complex expression.
+
+    Axioms can be added after the completion has been saturated. The new rules are applied to
+    the names that are already classified, so saturating again only derives what is new.
+    """
+    def __init__(self):
+        self.concept_ids: Dict[ConceptExpression, int] = {}
+        self.role_ids: Dict[Role, int] = {}
+        self.subsumers: List[Set[int]] = []
+        self.successors: List[Dict[int, Set[int]]] = []
+        self.predecessors: List[Set[Tuple[int, int]]] = []
+        self.subsumed_by: Dict[int, Set[int]] = defaultdict(set)
+
+        self.told: Dict[int, List[int]] = defaultdict(list)
+        self.conjunctions: Dict[int, List[Tuple[Tuple[int, ...], int]]] = defaultdict(list)
+        self.exists_right: Dict[int, List[Tuple[int, int]]] = defaultdict(list)
+        self.exists_left: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+
+        self.queue: List[Tuple[int, int]] = []
+        self._new_name() # ⊤
+
+    def add_axiom(self, axiom: InclusionAxiom) -> None:
+        """Normalizes an axiom and adds the resulting rules to the completion.
+
+        Args:
+            axiom (InclusionAxiom): Axiom to be added
+        """
+        left = self._left_name(axiom.left)
+        self._add_right(left, axiom.right)
+
+    def add_concept(self, node: Node) -> int:
+        """Adds a fresh name that is defined to be subsumed by the given expression.
+
+        Args:
+            node (Node): The expression
+
+        Returns:
+            int: The fresh name
+        """
+        name = self._new_name()
+        self._add_right(name, node)
+        return name
+
+    def mark(self) -> int:
+        """Marks the current state of the completion, so that names added afterwards can be removed
+        with `rollback`. Only names added with `add_concept` can be rolled back.
+
+        Returns:
+            int: The mark
+        """
+        return len(self.subsumers)
+
+    def rollback(self, mark: int) -> None:
+        """Removes every name added after the mark. The completion has to be saturated.
+
+        Args:
+            mark (int): A mark given by `mark`
+        """
+        for x in range(mark, len(self.subsumers)):
+            for r, targets in self.successors[x].items():
+                for y in targets:
+                    if y < mark:
+                        self.predecessors[y].discard((r, x))
+            for a in self.subsumers[x]:
+                if a < mark:
+                    self.subsumed_by[a].discard(x)
+                else:
+                    self.subsumed_by.pop(a, None)
+            self.told.pop(x, None)
+            self.exists_right.pop(x, None)
+
+        del self.subsumers[mark:]
+        del self.successors[mark:]
+        del self.predecessors[mark:]
+        self.concept_ids = {c: i for c, i in self.concept_ids.items() if i < mark}
+
+    def get_name(self, concept: ConceptExpression) -> int | None:
+        """Gets the name of a concept expression.
+
+        Args:
+            concept (ConceptExpression): The concept expression
+
+        Returns:
+            int | None: The name. None if the concept is not in the completion.
+        """
+        return self.concept_ids.get(concept)
+
+    def saturate(self) -> None:
+        """Applies the completion rules until nothing more can be derived.
+        """
+        while len(self.queue) > 0:
+            x, a = self.queue.pop()
+
+            for b in self.told.get(a, ()):
+                self._add_subsumer(x, b)
+
+            for premises, b in self.conjunctions.get(a, ()):
+                if all(p in self.subsumers[x] for p in premises):
+                    self._add_subsumer(x, b)
+
+            for r, b in self.exists_right.get(a, ()):
+                self._add_link(x, r, b)
+
+            for r, z in self.predecessors[x]:
+                for b in self.exists_left.get((r, a), ()):
+                    self._add_subsumer(z, b)
+
+    def is_subsumed(self, name: int, node: Node) -> bool:
+        """Checks if a name is subsumed by an expression. The completion has to be saturated.
+
+        Args:
+            name (int): The name to check
+            node (Node): The expression that should subsume the name
+
+        Returns:
+            bool: True if the name is subsumed by the expression
+        """
+        for c in node.labels:
+            if c not in self.concept_ids or self.concept_ids[c] not in self.subsumers[name]:
+                return False
+
+        for e in node.edges:
+            if e.label not in self.role_ids:
+                return False
+            targets = self.successors[name].get(self.role_ids[e.label], set())
+            if not any(self.is_subsumed(t, e.target) for t in targets):
+                return False
+
+        return True
+
+    def _new_name(self) -> int:
+        name = len(self.subsumers)
+        self.subsumers.append(set())
+        self.successors.append({})
+        self.predecessors.append(set())
+        self._add_subsumer(name, name)
+        self._add_subsumer(name, TOP)
+        return name
+
+    def _concept_name(self, concept: ConceptExpression) -> int:
+        if concept not in self.concept_ids:
+            self.concept_ids[concept] = self._new_name()
+        return self.concept_ids[concept]
+
+    def _role_name(self, role: Role) -> int:
+        if role not in self.role_ids:
+            self.role_ids[role] = len(self.role_ids)
+        return self.role_ids[role]
+
+    def _add_subsumer(self, x: int, a: int) -> None:
+        if a not in self.subsumers[x]:
+            self.subsumers[x].add(a)
+            self.subsumed_by[a].add(x)
+            self.queue.append((x, a))
+
+    def _add_link(self, x: int, r: int, y: int) -> None:
+        targets = self.successors[x].setdefault(r, set())
+        if y in targets:
+            return
+        targets.add(y)
+        self.predecessors[y].add((r, x))
+
+        for a in list(self.subsumers[y]):
+            for b in self.exists_left.get((r, a), ()):
+                self._add_subsumer(x, b)
+
+    def _left_name(self, node: Node) -> int:
+        """Gives a name that subsumes the expression, by adding normalized axioms for the
+        left side of an inclusion.
+        """
+        names = [self._concept_name(c) for c in node.labels]
+        for e in node.edges:
+            name = self._new_name()
+            self._add_exists_left(self._role_name(e.label), self._left_name(e.target), name)
+            names.append(name)
+
+        if len(names) == 0:
+            return TOP
+        if len(names) == 1:
+            return names[0]
+
+        name = self._new_name()
+        self._add_conjunction(tuple(names), name)
+        return name
+
+    def _add_right(self, name: int, node: Node) -> None:
+        """Adds normalized axioms saying that the name is subsumed by the expression.
+        """
+        for c in node.labels:
+            self._add_told(name, self._concept_name(c))
+
+        for e in node.edges:
+            target = e.target
+            if len(target.labels) == 0 and len(target.edges) == 0:
+                b = TOP
+            elif len(target.labels) == 1 and len(target.edges) == 0:
+                b = self._concept_name(target.labels[0])
+            else:
+                b = self._new_name()
+                self._add_right(b, target)
+            self._add_exists_right(name, self._role_name(e.label), b)
+
+    # When a rule is added, it is applied to the names that are already classified.
+
+    def _add_told(self, a: int, b: int) -> None:
+        self.told[a].append(b)
+        for x in list(self.subsumed_by[a]):
+            self._add_subsumer(x, b)
+
+    def _add_conjunction(self, premises: Tuple[int, ...], b: int) -> None:
+        for p in set(premises):
+            self.conjunctions[p].append((premises, b))
+        for x in list(self.subsumed_by[premises[0]]):
+            if all(p in self.subsumers[x] for p in premises):
+                self._add_subsumer(x, b)
+
+    def _add_exists_right(self, a: int, r: int, b: int) -> None:
+        self.exists_right[a].append((r, b))
+        for x in list(self.subsumed_by[a]):
+            self._add_link(x, r, b)
+
+    def _add_exists_left(self, r: int, a: int, b: int) -> None:
+        self.exists_left[(r, a)].append(b)
+        for y in list(self.subsumed_by[a]):
+            for r2, x in list(self.predecessors[y]):
+                if r2 == r:
+                    self._add_subsumer(x, b)
+
+
+class ElEngine:
+    """
+    Implementation of the Engine protocol that reasons in-process. It decides EL subsumption with
+    completion rules instead of running an external reasoner.
+
+    In incremental mode, the engine keeps the saturated completion of the hypothesis and updates it
+    when an axiom is added. Most entailment checks are then lookups in the completion. Otherwise
+    the hypothesis is classified from scratch for every check.
+    """
+    def __init__(self, incremental: bool = True):
+        self.ontology_list: OntologyMap = OntologyMap({}, {})
+        self.axioms: List[InclusionAxiom] = []
+        self.incremental = incremental
+        self.completion = Completion()
+
+    def entails(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool:
+        """The method should implement whether or not an axiom is entailed by the engines ontology.
+
+        This implementation adds the left side of the axiom as a fresh name to a completion of the
+        ontology, saturates it and checks if the name is subsumed by the right side. If the left
+        side is a concept expression known to the completion, the name is looked up instead.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology | InclusionAxiom): The axiom to test
+
+        Returns:
+            bool: True if the axiom is entailed from the engines ontology
+        """
+        if not isinstance(axiom, InclusionAxiom):
+            axiom = axiom.inclusion_axiom()
+
+        if not self.incremental:
+            completion = Completion()
+            for a in self.axioms:
+                completion.add_axiom(a)
+            name = completion.add_concept(axiom.left)
+            completion.saturate()
+            return completion.is_subsumed(name, axiom.right)
+
+        completion = self.completion
+        if len(axiom.left.labels) == 1 and len(axiom.left.edges) == 0:
+            name = completion.get_name(axiom.left.labels[0])
+            if name != None:
+                return completion.is_subsumed(name, axiom.right)
+
+        mark = completion.mark()
+        name = completion.add_concept(axiom.left)
+        completion.saturate()
+        entails = completion.is_subsumed(name, axiom.right)
+        completion.rollback(mark)
+
+        return entails
+
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms whether or not it is entailed by the engines ontology.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology | InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed from the engines ontology
+        """
+        return [self.entails(a) for a in axioms]
+
+    def add_axiom(self, axiom: RightTerminology | LeftTerminology):
+        """Adds an axiom to the engines ontology. If there is a right terminology with that given concept, it gets overwritten.
+        Left terminologies with the same concept are kept, as they are not merged by the learner.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology): Axiom to be added
+        """
+        # Stored the same way as in OwlEngine, so the two engines give the same hypothesis.
+        if isinstance(axiom, LeftTerminology) and len(axiom.left.labels) == 1 and len(axiom.left.edges) == 0:
+            axiom = RightTerminology(axiom.left.labels[0], Node([axiom.right],[]))
+
+        # The learner keeps changing expressions after they are added, so the engine reasons over a copy
+        self.axioms.append(copy.deepcopy(axiom.inclusion_axiom()))
+        self.ontology_list.add_axiom(axiom)
+
+        if self.incremental:
+            self.completion.add_axiom(self.axioms[-1])
+            self.completion.saturate()
+
+    def compact(self) -> None:
+        """Replaces the hypothesis with an equivalent one without redundant axioms and conjuncts,
+        see `compact_hypothesis`. The completion is built again from the smaller hypothesis.
+        """
+        hypothesis = compact_hypothesis(self.axioms)
+        self.ontology_list = OntologyMap({}, {})
+        self.axioms = []
+        self.completion = Completion()
+        for axiom in hypothesis:
+            self.add_axiom(axiom)
+
+    def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
+        """Get the ontology in form of axioms
+
+        Returns:
+            List[Right | Left]: The ontology as a list of axioms
+        """
+        return self.ontology_list.get_list()
+
+    def get_right_from_hypothesis(self, concept_expression: ConceptExpression) -> RightTerminology | None:
+        if concept_expression not in self.ontology_list.right_map:
+            return None
+        return self.ontology_list.right_map[concept_expression]
+
+
+def compact_hypothesis(axioms: List[InclusionAxiom]) -> List[RightTerminology | LeftTerminology]:
+    """Removes redundancy from a hypothesis. The result is equivalent to the given axioms.
+
+    The axioms with the same concept on the left are first merged into one right terminology. Then
+    every axiom that follows from the others is dropped, and every conjunct at the root of a right
+    terminology that follows from the rest of the hypothesis is dropped.
+
+    Args:
+        axioms (List[InclusionAxiom]): The axioms of the hypothesis. An axiom with a complex left
+            side should have a single concept on the right.
+
+    Returns:
+        List[RightTerminology | LeftTerminology]: The compacted hypothesis
+    """
+    rights: Dict[ConceptExpression, RightTerminology] = {}
+    lefts: Dict[Tuple[CanonicalNode, ConceptExpression], LeftTerminology] = {}
+    for axiom in copy.deepcopy(axioms):
+        if len(axiom.left.labels) == 1 and len(axiom.left.edges) == 0:
+            concept = axiom.left.labels[0]
+            if concept in rights:
+                right = rights[concept].right
+                right.labels.extend(c for c in axiom.right.labels if c not in right.labels)
+                right.edges.extend(axiom.right.edges)
+            else:
+                rights[concept] = RightTerminology(concept, axiom.right)
+        else:
+            lefts[(axiom.left.canonical(), axiom.right.labels[0])] = LeftTerminology(axiom.left, axiom.right.labels[0])
+
+    hypothesis: List[RightTerminology | LeftTerminology] = list(lefts.values())
+    hypothesis.extend(rights.values())
+
+    i = 0
+    while i < len(hypothesis):
+        if _entailed_by(hypothesis[:i] + hypothesis[i+1:], hypothesis[i]):
+            hypothesis.pop(i)
+        else:
+            i += 1
+
+    for axiom in hypothesis:
+        if not isinstance(axiom, RightTerminology):
+            continue
+        node = axiom.right
+        # The conjunct is removed, and put back if the smaller axiom does not give it back
+        for j in range(len(node.labels) - 1, -1, -1):
+            label = node.labels.pop(j)
+            if not _entailed_by(hypothesis, RightTerminology(axiom.left, Node([label], []))):
+                node.labels.insert(j, label)
+        for j in range(len(node.edges) - 1, -1, -1):
+            edge = node.edges.pop(j)
+            if not _entailed_by(hypothesis, RightTerminology(axiom.left, Node([], [edge]))):
+                node.edges.insert(j, edge)
+
+    return hypothesis
+
+def _entailed_by(hypothesis: List[RightTerminology | LeftTerminology], axiom: RightTerminology | LeftTerminology) -> bool:
+    completion = Completion()
+    for a in hypothesis:
+        completion.add_axiom(a.inclusion_axiom())
+    inclusion = axiom.inclusion_axiom()
+    name = completion.add_concept(inclusion.left)
+    completion.saturate()
+    return completion.is_subsumed(name, inclusion.right)
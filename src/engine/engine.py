@@ -16,14 +16,33 @@ class Engine(Protocol):
         """
         ...
     
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms whether or not it is entailed by the engines ontology.
+        Engines should answer the whole list at once when that is cheaper than asking one by one.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology | InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed from the engines ontology
+        """
+        ...
+    
     def add_axiom(self, axiom: RightTerminology | LeftTerminology):
-        """Adds an axiom to the engines ontology. If there is a terminology with that given concept, it gets overwritten.
+        """Adds an axiom to the engines ontology. If there is a right terminology with that given concept, it gets overwritten.
+        Left terminologies with the same concept are kept, as they are not merged by the learner.
 
         Args:
             axiom (RightTerminology | LeftTerminology): Axiom to be added
         """
         ...
     
+    def compact(self) -> None:
+        """Replaces the hypothesis with an equivalent one without redundant axioms and conjuncts.
+        Engines that cannot do this leave the hypothesis as it is.
+        """
+        ...
+    
     def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
         """Get the ontology in form of axioms
 
@@ -1,12 +1,19 @@
 from dataclasses import dataclass
-from typing import Any, Dict, List
-from owlready2 import Ontology, And, GeneralClassAxiom, ObjectProperty, Thing, sync_reasoner, ThingClass, ObjectPropertyClass
+from typing import Any, Dict, List, Set, Tuple
+from owlready2 import Ontology, Namespace, And, GeneralClassAxiom, ObjectProperty, Thing, Nothing, ThingClass, ObjectPropertyClass, OwlReadyInconsistentOntologyError, OwlReadyJavaError
+from owlready2.base import owl_imports
 import owlready2
+import owlready2.reasoning
+import copy
+import subprocess
+import tempfile
+import time
 from src.data.special import RightTerminology, LeftTerminology
 import types
 import os
 
-from src.data.communication import ConceptExpression, Edge, Node, InclusionAxiom
+from src.data.communication import CanonicalNode, ConceptExpression, Edge, Node, InclusionAxiom
+from src.engine.hermit_session import HermitSession
 
 owl_java = "JAVA_EXE"
 if owl_java in os.environ:
@@ -16,8 +23,11 @@ if owl_java in os.environ:
 class OntologyMap:
     """
     Object used for having control over axioms in the ontology. Only accepts Terminologies.
+    
+    A right terminology replaces the one with the same concept, since the learner merges them first.
+    Left terminologies are kept side by side, as long as their expressions differ.
     """
-    left_map: Dict[ConceptExpression, LeftTerminology]
+    left_map: Dict[Tuple[CanonicalNode, ConceptExpression], LeftTerminology]
     right_map: Dict[ConceptExpression, RightTerminology]
     
     def add_axiom(self, axiom: LeftTerminology | RightTerminology) -> None:
@@ -27,7 +37,7 @@ class OntologyMap:
             axiom (LeftTerminology | RightTerminology): Axiom to add
         """
         if isinstance(axiom, LeftTerminology):
-            self.left_map[axiom.right] = axiom
+            self.left_map[(axiom.left.canonical(), axiom.right)] = axiom
         elif isinstance(axiom, RightTerminology):
             self.right_map[axiom.left] = axiom
     
@@ -43,17 +53,30 @@ class OntologyMap:
 
 class OwlEngine:
     """
-    Implementation of the Engine protocol
+    Implementation of the Engine protocol.
+    
+    By default every entailment check runs HermiT on the hypothesis together with a scratch
+    ontology that holds the query classes. With `warm_session`, the engine instead owns a
+    `HermitSession` that keeps one HermiT process alive, and is only sent the axioms that are added.
+    
+    The time spent waiting on the reasoner is summed up in `reasoner_seconds`.
     """
-    def __init__(self, ontology: Ontology):
+    def __init__(self, ontology: Ontology, warm_session: bool = False):
         self.ontology = ontology
         self.ontology_list: OntologyMap = OntologyMap({}, {})
+        self.axioms: List[InclusionAxiom] = []
+        # What the engine wrote into the ontology, as the class or general class axiom and the
+        # expression that was added to its is_a
+        self.written: List[Tuple[Any, Any]] = []
+        self.session: HermitSession | None = HermitSession(ontology) if warm_session else None
+        self.scratch_iri = ontology.base_iri.rstrip("#/") + "/scratch"
+        self.reasoner_seconds = 0.0
     
     def entails(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool:
         """The method should implement whether or not an axiom is entailed by the engines ontology.
         
-        This implementation works by adding temporary concept expressions to the ontology and then
-        removing it after checking for ancestors.
+        This implementation works by adding temporary concept expressions to a scratch ontology, and
+        checking their ancestors after classifying it together with the hypothesis.
 
         Args:
             axiom (RightTerminology | LeftTerminology | InclusionAxiom): The axiom to test
@@ -61,55 +84,137 @@ class OwlEngine:
         Returns:
             bool: True if the axiom is entailed from the engines ontology
         """
+        return self.entails_many([axiom])[0]
+    
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms whether or not it is entailed by the engines ontology.
         
-        if isinstance(axiom, InclusionAxiom):
-            # Creates two concept expressions in order to get around the fact that the engine is made
-            # with terminologies in mind
-            temp_sub_class = ConceptExpression("TempSubClass")
-            temp_super_class = ConceptExpression("TempSuperClass")
-            
-            self.add_axiom(RightTerminology(temp_sub_class, axiom.left))
-            self.add_axiom(LeftTerminology(axiom.right, temp_super_class))
-            
-            sync_reasoner(self.ontology)
-            
-            entails = self.ontology[temp_super_class.name] in self.ontology[temp_sub_class.name].ancestors() # type: ignore[ancestors]
-            
-            with self.ontology:
-                owlready2.destroy_entity(self.ontology[temp_super_class.name])
-                owlready2.destroy_entity(self.ontology[temp_sub_class.name])
-            
+        Every axiom gets its own temporary concept expressions, so the reasoner only has to run once
+        for all of them. The checks have no side effects on the hypothesis ontology.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology | InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed from the engines ontology
+        """
+        if len(axioms) == 0:
+            return []
+        if self.session != None:
+            start = time.perf_counter()
+            entails = self.session.entails_many([a if isinstance(a, InclusionAxiom) else a.inclusion_axiom() for a in axioms])
+            self.reasoner_seconds += time.perf_counter() - start
             return entails
         
-        # Creates one new concept expression to check if it is correct
-        entails: bool = False
-        temp_class = ConceptExpression("TempClass")
-        if isinstance(axiom, RightTerminology):    
-            self.add_axiom(LeftTerminology(axiom.right,temp_class))
-            
-            sync_reasoner(self.ontology)                 
-            b = self.ontology[axiom.left.name]
-            
-            if b != None:
-                entails = self.ontology[temp_class.name] in b.ancestors() # type: ignore[ancestors]
-        elif isinstance(axiom, LeftTerminology):
-            self.add_axiom(RightTerminology(temp_class,axiom.left))
-            
-            sync_reasoner(self.ontology)                 
-            b = self.ontology[axiom.right.name]
+        # The temporary classes are made in a scratch ontology that imports the hypothesis. The
+        # hypothesis is never written to, and the scratch ontology is thrown away as a whole. The
+        # reasoner is given the scratch ontology with everything it imports, directly or not.
+        scratch = self.ontology.world.get_ontology(self.scratch_iri)
+        scratch.imported_ontologies.append(self.ontology)
+        namespace = scratch.get_namespace(self.ontology.base_iri)
+        
+        try:
+            # For each axiom, the entailment is checked as sub class ⊑ super class
+            checks: List[Tuple[str, str]] = []
+            for i, axiom in enumerate(axioms):
+                if isinstance(axiom, RightTerminology):
+                    sub, sup = Node([axiom.left], []), axiom.right
+                elif isinstance(axiom, LeftTerminology):
+                    sub, sup = axiom.left, Node([axiom.right], [])
+                else:
+                    sub, sup = axiom.left, axiom.right
+                checks.append((self._query_class(sub, f"TempSubClass{i}", namespace), self._query_class(sup, f"TempSuperClass{i}", namespace)))
             
-            if b != None:
-                entails = b in self.ontology[temp_class.name].ancestors() # type: ignore[ancestors]
-        with self.ontology:
-            owlready2.destroy_entity(self.ontology[temp_class.name])
+            start = time.perf_counter()
+            parents = _classify(list(scratch.indirectly_imported_ontologies()))
+            self.reasoner_seconds += time.perf_counter() - start
+        finally:
+            scratch.destroy()
+        
+        # A class is subsumed by itself, which the reasoner does not report
+        entails: List[bool] = []
+        for sub, sup in checks:
+            ancestors = _ancestors(parents, sub)
+            entails.append(sup == Thing.iri or sup == sub or sup in ancestors or Nothing.iri in ancestors)
         return entails
     
+    def _query_class(self, node: Node, name: str, namespace: Namespace) -> str:
+        """Gives a named class that is equivalent to a node, for use in an entailment check. A
+        temporary class is only made if the node is not already a single concept expression or ⊤.
+
+        Args:
+            node (Node): The node
+            name (str): The name of the temporary class
+            namespace (Namespace): Where the temporary class is made
+
+        Returns:
+            str: The IRI of the class
+        """
+        if len(node.labels) == 0 and len(node.edges) == 0:
+            return Thing.iri
+        if len(node.labels) == 1 and len(node.edges) == 0:
+            return self._concept_convert(node.labels[0], namespace).iri
+        
+        complex_expression = self._node_convert(node, namespace)
+        with namespace:
+            temp_class = types.new_class(name, (Thing, ))
+            temp_class.equivalent_to.append(complex_expression) # type: ignore[equivalent_to]
+        return temp_class.iri
+    
     def add_axiom(self, axiom: RightTerminology | LeftTerminology):
-        """Adds an axiom to the engines ontology. If there is a terminology with that given concept, it gets overwritten.
+        """Adds an axiom to the engines ontology. If there is a right terminology with that given concept, it gets overwritten.
+        Left terminologies with the same concept are kept, as they are not merged by the learner.
 
         Args:
             axiom (RightTerminology | LeftTerminology): Axiom to be added
         """
+        axiom = self._write_axiom(axiom)
+        self.ontology_list.add_axiom(axiom)
+        # Every axiom that was written stays in the ontology, also when it is replaced in the map
+        self.axioms.append(copy.deepcopy(axiom.inclusion_axiom()))
+        
+        if self.session != None:
+            self.session.add_axiom(axiom.inclusion_axiom())
+    
+    def compact(self) -> None:
+        """Replaces the hypothesis with an equivalent one without redundant axioms and conjuncts, see
+        `compact_hypothesis`. Every axiom the engine wrote is removed from the ontology, and the
+        smaller hypothesis is written again. The rest of the ontology is kept. A warm session is
+        stopped, and loads the new ontology on the next check.
+        """
+        # Imported here, since el_engine imports this module
+        from src.engine.el_engine import compact_hypothesis
+        hypothesis = compact_hypothesis(self.axioms)
+        
+        for subject, expression in self.written:
+            subject.is_a.remove(expression)
+        self.written = []
+        
+        self.ontology_list = OntologyMap({}, {})
+        self.axioms = []
+        for axiom in hypothesis:
+            axiom = self._write_axiom(axiom)
+            self.ontology_list.add_axiom(axiom)
+            self.axioms.append(copy.deepcopy(axiom.inclusion_axiom()))
+        
+        if self.session != None:
+            self.session.close()
+    
+    def close(self):
+        """Stops the reasoner session, if the engine has one.
+        """
+        if self.session != None:
+            self.session.close()
+    
+    def _write_axiom(self, axiom: RightTerminology | LeftTerminology) -> RightTerminology | LeftTerminology:
+        """Writes an axiom into the owlready2 ontology, without adding it to the hypothesis.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology): Axiom to be written
+
+        Returns:
+            RightTerminology | LeftTerminology: The axiom in the form it was written
+        """
         if isinstance(axiom, LeftTerminology):
             # Checks if it is better as a right terminology. This has to do with the way owlready2 works.
             if len(axiom.left.labels) == 1 and len(axiom.left.edges) == 0:
@@ -120,12 +225,14 @@ class OwlEngine:
                 with self.ontology:
                     gca = GeneralClassAxiom(complex_expression)
                     gca.is_a.append(concept_expression) # type: ignore[is_a]
+                self.written.append((gca, concept_expression))
         if isinstance(axiom, RightTerminology):
             complex_expression = self._node_convert(axiom.right)
             concept_expression = self._concept_convert(axiom.left)
             with self.ontology:
                 concept_expression.is_a.append(complex_expression) # type: ignore[is_a]
-        self.ontology_list.add_axiom(axiom)
+            self.written.append((concept_expression, complex_expression))
+        return axiom
         
     def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
         """Get the ontology in form of axioms
@@ -135,11 +242,12 @@ class OwlEngine:
         """
         return self.ontology_list.get_list()
     
-    def _node_convert(self, node: Node) -> ThingClass | ObjectPropertyClass | And:
+    def _node_convert(self, node: Node, namespace: Namespace | None = None) -> ThingClass | ObjectPropertyClass | And:
         """Converts a Node object into something that owlready2 can handle
 
         Args:
             node (Node): input
+            namespace (Namespace | None, optional): Where missing concepts and roles are made. Defaults to the ontology.
 
         Returns:
             ThingClass | ObjectPropertyClass | And: returns in owlready2 form
@@ -148,38 +256,99 @@ class OwlEngine:
         if len(node.labels) == 0 and len(node.edges) == 0:
             return Thing
         
-        a: List[ThingClass | ObjectPropertyClass] = [self._concept_convert(c) for c in node.labels]
-        a.extend([self._edge_convert(c) for c in node.edges])
+        a: List[ThingClass | ObjectPropertyClass] = [self._concept_convert(c, namespace) for c in node.labels]
+        a.extend([self._edge_convert(c, namespace) for c in node.edges])
         
         if len(a) <= 1:
             return a[0]
         
         return And(a)
     
-    def _concept_convert(self, concept: ConceptExpression) -> ThingClass:
+    def _concept_convert(self, concept: ConceptExpression, namespace: Namespace | None = None) -> ThingClass:
         """Converts a concept expression into owlready2 form. If the concept does not exist in
         the ontology, it is added.
 
         Args:
             concept (ConceptExpression): input concept
+            namespace (Namespace | None, optional): Where the concept is made if it is missing. Defaults to the ontology.
 
         Returns:
             ThingClass: returned class.
         """
-        with self.ontology:
-            c = self.ontology[concept.name]
+        namespace = namespace or self.ontology
+        with namespace:
+            c = namespace[concept.name]
             if c == None:
                 c= types.new_class(concept.name, (Thing, ))
             return c
     
-    def _edge_convert(self, edge: Edge) -> ObjectPropertyClass: # Not correct type i think.
-        with self.ontology:
-            c = self.ontology[edge.label.name]
+    def _edge_convert(self, edge: Edge, namespace: Namespace | None = None) -> ObjectPropertyClass: # Not correct type i think.
+        namespace = namespace or self.ontology
+        with namespace:
+            c = namespace[edge.label.name]
             if c == None:
                 c = types.new_class(edge.label.name, (ObjectProperty, ))
-            return c.some(self._node_convert(edge.target))
+            return c.some(self._node_convert(edge.target, namespace))
     
     def get_right_from_hypothesis(self, concept_expression: ConceptExpression) -> RightTerminology | None:
         if concept_expression not in self.ontology_list.right_map:
             return None
         return self.ontology_list.right_map[concept_expression]
+
+
+def _classify(ontologies: List[Ontology]) -> Dict[str, Set[str]]:
+    """Classifies the ontologies with HermiT. Unlike `sync_reasoner`, the result is not written back
+    into the ontologies. HermiT is run the same way as in `owlready2.sync_reasoner_hermit`, which
+    is why the owlready2 version is pinned.
+
+    Args:
+        ontologies (List[Ontology]): The ontologies, together with every ontology they import
+
+    Returns:
+        Dict[str, Set[str]]: The direct super classes of each class, by IRI. Equivalent classes are
+        super classes of each other.
+    """
+    # The ontologies are all in the file, so the imports are left out. Otherwise HermiT tries to
+    # load the imported ontologies from their IRIs.
+    def save_filter(graph, s, p, o, d) -> bool:
+        return p != owl_imports
+    
+    tmp = tempfile.NamedTemporaryFile("wb", delete=False)
+    try:
+        for o in ontologies:
+            o.save(tmp, format="ntriples", filter=save_filter, commit=False)
+        tmp.close()
+        
+        command = [owlready2.JAVA_EXE, f"-Xmx{owlready2.reasoning.JAVA_MEMORY}M", "-cp", owlready2.reasoning._HERMIT_CLASSPATH,
+                   "org.semanticweb.HermiT.cli.CommandLine", "-c", "-O", "-D", "-I", "file:///" + tmp.name.replace("\\", "/")]
+        try:
+            output = subprocess.check_output(command, stderr=subprocess.STDOUT).decode().replace("\r", "")
+        except subprocess.CalledProcessError as e:
+            if e.returncode == 1 and b"Inconsistent ontology" in (e.output or b""):
+                raise OwlReadyInconsistentOntologyError()
+            raise OwlReadyJavaError("Java error message is:\n" + (e.output or b"").decode(errors="replace"))
+    finally:
+        os.unlink(tmp.name)
+    
+    parents: Dict[str, Set[str]] = {}
+    for relation, iris in owlready2.reasoning._HERMIT_RESULT_REGEXP.findall(output):
+        classes = iris[1:-1].split("> <")
+        if relation == "SubClassOf":
+            parents.setdefault(classes[0], set()).add(classes[1])
+        elif relation == "EquivalentClasses":
+            for c in classes:
+                parents.setdefault(c, set()).update(d for d in classes if d != c)
+    return parents
+
+def _ancestors(parents: Dict[str, Set[str]], iri: str) -> Set[str]:
+    """Gives the classes above a class in the result of `_classify`. The class itself is only
+    included if it is on a cycle of equivalent classes.
+    """
+    ancestors: Set[str] = set()
+    stack = [iri]
+    while len(stack) > 0:
+        for p in parents.get(stack.pop(), ()):
+            if p not in ancestors:
+                ancestors.add(p)
+                stack.append(p)
+    return ancestors
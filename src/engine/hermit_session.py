@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from multiprocessing.connection import Connection
+from typing import Any, List
+import multiprocessing
+import importlib.util
+import tempfile
+import glob
+import os
+
+import owlready2
+from owlready2 import Ontology
+from owlready2.base import owl_imports
+from owlready2.reasoning import _HERMIT_CLASSPATH
+
+from src.data.communication import InclusionAxiom, Node
+
+class HermitSession:
+    """
+    A long-lived HermiT reasoner. HermiT runs in a worker process that keeps one JVM alive across
+    queries, so the JVM is only started once instead of once per query. The worker is given the
+    ontology when it starts and is afterwards only sent the axioms that are added. Queries are
+    answered over a pipe.
+
+    If the worker dies, it is started again from the current state of the ontology.
+
+    The worker talks to HermiT through the OWL API bundled with owlready2. This needs the `JPype1`
+    package.
+    """
+    def __init__(self, ontology: Ontology):
+        if importlib.util.find_spec("jpype") == None:
+            raise ImportError("HermitSession needs the JPype1 package")
+
+        self.ontology = ontology
+        self._process: Any = None
+        self._connection: Connection | None = None
+
+    def add_axiom(self, axiom: InclusionAxiom) -> None:
+        """Sends an axiom to the reasoner. The axiom must already be added to the ontology, so
+        that it is included if the reasoner has to be restarted.
+
+        Args:
+            axiom (InclusionAxiom): The axiom that was added
+        """
+        if not self.is_alive():
+            # The axiom is part of the ontology that is loaded when starting
+            self.start()
+            return
+        self._request("add", axiom)
+
+    def entails(self, axiom: InclusionAxiom) -> bool:
+        """Checks if an axiom is entailed by the ontology.
+
+        Args:
+            axiom (InclusionAxiom): The axiom to test
+
+        Returns:
+            bool: True if the axiom is entailed
+        """
+        return self.entails_many([axiom])[0]
+
+    def entails_many(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks if each of the axioms is entailed by the ontology.
+
+        Args:
+            axioms (List[InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed
+        """
+        return self._request("entails", axioms)
+
+    def is_alive(self) -> bool:
+        return self._process != None and self._process.is_alive()
+
+    def start(self) -> None:
+        """Starts the worker, and gives it the current ontology. A running worker is closed first.
+        """
+        self.close()
+
+        # Saved the same way as owlready2 does before running HermiT. The imported ontologies are in
+        # the file, so the imports are left out.
+        def save_filter(graph, s, p, o, d) -> bool:
+            return p != owl_imports
+        
+        file = tempfile.NamedTemporaryFile("wb", suffix=".nt", delete=False)
+        for ontology in self.ontology.indirectly_imported_ontologies():
+            ontology.save(file, format="ntriples", filter=save_filter, commit=False)
+        file.close()
+
+        context = multiprocessing.get_context("spawn")
+        self._connection, child = context.Pipe()
+        self._process = context.Process(target=_serve, args=(child, _jvm_path(), _HERMIT_CLASSPATH, self.ontology.base_iri), daemon=True)
+        self._process.start()
+        child.close()
+
+        try:
+            self._send("load", file.name)
+        except (EOFError, OSError) as e:
+            # The worker died before it could answer, most often because the JVM could not start
+            self.close()
+            raise RuntimeError("The HermiT session could not be started. Check that JAVA_EXE points to a working java, and that JPype1 can find its JVM.") from e
+        finally:
+            os.remove(file.name)
+
+    def close(self) -> None:
+        """Stops the worker.
+        """
+        if self._connection != None:
+            try:
+                self._connection.send(("close", None))
+            except OSError:
+                pass
+            self._connection.close()
+            self._connection = None
+        if self._process != None:
+            self._process.join(timeout=5)
+            if self._process.is_alive():
+                self._process.kill()
+            self._process = None
+
+    def _request(self, command: str, argument: Any) -> Any:
+        if not self.is_alive():
+            self.start()
+        try:
+            return self._send(command, argument)
+        except (EOFError, OSError):
+            # The worker died. Restarting it loads the ontology again.
+            self.start()
+            if command == "add":
+                return None
+            return self._send(command, argument)
+
+    def _send(self, command: str, argument: Any) -> Any:
+        assert self._connection != None
+        self._connection.send((command, argument))
+        status, result = self._connection.recv()
+        if status == "error":
+            raise RuntimeError("HermiT session failed: " + result)
+        return result
+
+
+def _jvm_path() -> str | None:
+    """Finds the JVM library that belongs to the java executable used by owlready2.
+
+    Returns:
+        str | None: Path to the JVM library. None if JPype should look for it.
+    """
+    java = owlready2.JAVA_EXE
+    if os.path.dirname(java) == "":
+        return None
+    java_home = os.path.dirname(os.path.dirname(os.path.realpath(java)))
+    for pattern in ["lib/server/libjvm.*", "jre/lib/*/server/libjvm.*", "bin/server/jvm.dll", "jre/bin/server/jvm.dll"]:
+        found = glob.glob(os.path.join(java_home, pattern))
+        if len(found) > 0:
+            return found[0]
+    return None
+
+
+def _serve(connection: Connection, jvm_path: str | None, classpath: str, base_iri: str) -> None:
+    """The main loop of the worker process. Commands are received as (command, argument) tuples
+    and answered with (status, result) tuples.
+    """
+    import jpype
+
+    jpype.startJVM(jvm_path or jpype.getDefaultJVMPath(), classpath=classpath.split(os.pathsep))
+
+    OWLManager = jpype.JClass("org.semanticweb.owlapi.apibinding.OWLManager")
+    IRI = jpype.JClass("org.semanticweb.owlapi.model.IRI")
+    File = jpype.JClass("java.io.File")
+    HashSet = jpype.JClass("java.util.HashSet")
+    Reasoner = jpype.JClass("org.semanticweb.HermiT.Reasoner")
+    Configuration = jpype.JClass("org.semanticweb.HermiT.Configuration")
+
+    manager = OWLManager.createOWLOntologyManager()
+    factory = manager.getOWLDataFactory()
+    ontology: Any = None
+    reasoner: Any = None
+
+    def convert(node: Node) -> Any:
+        parts = [factory.getOWLClass(IRI.create(base_iri + c.name)) for c in node.labels]
+        for e in node.edges:
+            role = factory.getOWLObjectProperty(IRI.create(base_iri + e.label.name))
+            parts.append(factory.getOWLObjectSomeValuesFrom(role, convert(e.target)))
+
+        if len(parts) == 0:
+            return factory.getOWLThing()
+        if len(parts) == 1:
+            return parts[0]
+
+        conjuncts = HashSet()
+        for p in parts:
+            conjuncts.add(p)
+        return factory.getOWLObjectIntersectionOf(conjuncts)
+
+    def subclass_axiom(axiom: InclusionAxiom) -> Any:
+        return factory.getOWLSubClassOfAxiom(convert(axiom.left), convert(axiom.right))
+
+    while True:
+        try:
+            command, argument = connection.recv()
+        except EOFError:
+            break
+
+        try:
+            if command == "close":
+                break
+            elif command == "load":
+                ontology = manager.loadOntologyFromOntologyDocument(File(argument))
+                reasoner = Reasoner(Configuration(), ontology)
+                connection.send(("ok", None))
+            elif command == "add":
+                manager.addAxiom(ontology, subclass_axiom(argument))
+                reasoner.flush()
+                connection.send(("ok", None))
+            elif command == "entails":
+                connection.send(("ok", [bool(reasoner.isEntailed(subclass_axiom(a))) for a in argument]))
+            else:
+                connection.send(("error", "Unknown command " + command))
+        except Exception as e:
+            connection.send(("error", str(e)))
+
+    connection.close()
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import CanonicalNode, ConceptExpression, InclusionAxiom, Role
+from src.engine.engine import Engine
+
+def simulates(sub: CanonicalNode, sup: CanonicalNode, memo: Dict[Tuple[CanonicalNode, CanonicalNode], bool] | None = None) -> bool:
+    """Checks if the tree of `sup` maps into the tree of `sub`: every label of `sup` is a label of
+    `sub`, and every edge of `sup` has an edge of `sub` with the same role whose target it maps into.
+    If it does, sub ⊑ sup holds in every ontology.
+
+    Args:
+        sub (CanonicalNode): The expression on the left of ⊑
+        sup (CanonicalNode): The expression on the right of ⊑
+        memo (Dict[Tuple[CanonicalNode, CanonicalNode], bool] | None, optional): Answers for pairs of
+            subtrees that were already checked
+
+    Returns:
+        bool: True if there is a mapping
+    """
+    if memo == None:
+        memo = {}
+    key = (sub, sup)
+    answer = memo.get(key)
+    if answer != None:
+        return answer
+
+    labels = set(sub.labels)
+    answer = all(c in labels for c in sup.labels) and all(
+        any(r == s and simulates(t, u, memo) for s, t in sub.edges) for r, u in sup.edges
+    )
+    memo[key] = answer
+    return answer
+
+class StructuralEngine:
+    """
+    Implementation of the Engine protocol that answers entailments it can settle from the shape of
+    the axiom, and asks the wrapped engine about the rest.
+
+    C ⊑ D holds in every ontology if the tree of D maps into the tree of C. The other shortcuts need
+    the hypothesis to be everything the wrapped engine reasons with, which is only known when the
+    engine is `closed`. An OwlEngine, for example, also reasons with what is already in its ontology.
+
+    For a closed engine with an empty hypothesis, the mapping is the only way C ⊑ D can hold, so the
+    answer is known in both directions. Otherwise, a label or role at the root of D can only hold at the root of C if C has it, or if it is
+    at the root of the right side of an axiom in the hypothesis. If neither is true, C ⊑ D does not hold.
+    A right terminology that is replaced stays part of the reasoning of the wrapped engines, so the
+    labels and roles of every added axiom are kept until the hypothesis is compacted.
+    """
+    def __init__(self, engine: Engine, closed: bool = False):
+        """
+        Args:
+            engine (Engine): The wrapped engine
+            closed (bool, optional): If the engine only reasons with the axioms that are added to it,
+                so it started out empty. Defaults to False, which only answers the entailments that
+                hold in every ontology.
+        """
+        self.engine = engine
+        self.closed = closed
+        self.hits = 0
+        self.misses = 0
+        self._update()
+
+    @property
+    def hit_rate(self) -> float:
+        """The share of entailments that were answered without the wrapped engine.
+        """
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+    def entails(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool:
+        """The method should implement whether or not an axiom is entailed by the engines ontology.
+        The wrapped engine is only asked if the shape of the axiom does not settle it.
+
+        Args:
+            axiom (RightTerminology | LeftTerminology | InclusionAxiom): The axiom to test
+
+        Returns:
+            bool: True if the axiom is entailed from the engines ontology
+        """
+        return self.entails_many([axiom])[0]
+
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms whether or not it is entailed by the engines ontology.
+        The axioms that the shape does not settle are sent to the wrapped engine as one list.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology | InclusionAxiom]): The axioms to test
+
+        Returns:
+            List[bool]: True for each axiom that is entailed from the engines ontology
+        """
+        answers = [self._structural(a) for a in axioms]
+
+        missing = [i for i, a in enumerate(answers) if a == None]
+        self.hits += len(axioms) - len(missing)
+        self.misses += len(missing)
+        if len(missing) > 0:
+            entails = self.engine.entails_many([axioms[i] for i in missing])
+            for i, e in zip(missing, entails):
+                answers[i] = e
+
+        return [a == True for a in answers]
+
+    def add_axiom(self, axiom: RightTerminology | LeftTerminology):
+        self.engine.add_axiom(axiom)
+        self._add(axiom)
+
+    def compact(self) -> None:
+        """Compacts the hypothesis of the wrapped engine.
+        """
+        self.engine.compact()
+        self._update()
+
+    def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
+        return self.engine.get_hypothesis()
+
+    def get_right_from_hypothesis(self, concept_expression: ConceptExpression) -> RightTerminology | None:
+        return self.engine.get_right_from_hypothesis(concept_expression)
+
+    def _structural(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool | None:
+        if not isinstance(axiom, InclusionAxiom):
+            axiom = axiom.inclusion_axiom()
+        left, right = axiom.canonical()
+
+        if simulates(left, right):
+            return True
+        if not self.closed:
+            return None
+        if self.empty:
+            return False
+
+        labels = set(left.labels)
+        roles = {r for r, _ in left.edges}
+        if any(c not in labels and c not in self.labels for c in right.labels):
+            return False
+        if any(r not in roles and r not in self.roles for r, _ in right.edges):
+            return False
+        return None
+
+    def _update(self) -> None:
+        """Finds the labels and roles at the root of the right sides of the hypothesis. This is only
+        done when the hypothesis holds every axiom the wrapped engine reasons with, which is at the
+        start and after compacting.
+        """
+        self.empty = True
+        self.labels: Set[ConceptExpression] = set()
+        self.roles: Set[Role] = set()
+        for axiom in self.engine.get_hypothesis():
+            self._add(axiom)
+
+    def _add(self, axiom: RightTerminology | LeftTerminology) -> None:
+        self.empty = False
+        if isinstance(axiom, RightTerminology):
+            self.labels.update(axiom.right.labels)
+            self.roles.update(e.label for e in axiom.right.edges)
+        else:
+            self.labels.add(axiom.right)
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from typing import Any, AsyncIterator, Awaitable, List
+import asyncio
+
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.engine.engine import Engine
+from src.learner.budget import Budget, Progress
+from src.learner.learner_impl import LearnerImpl, Saturation
+from src.teacher.async_teacher import AsyncTeacher
+
+class AsyncLearner:
+    """Runs the learner against an AsyncTeacher.
+
+    The learner itself runs in a worker thread, and its queries are sent to the teacher on the event
+    loop. The learner is speculative and uses batched saturation by default, so the independent
+    candidate checks of `decompose_right`, `sibling_merge`, saturation and counter example conversion
+    reach the teacher as batches, which it can answer concurrently.
+    """
+    def __init__(self, engine: Engine, teacher: AsyncTeacher, **options: Any):
+        """
+        Args:
+            engine (Engine): The engine holding the hypothesis
+            teacher (AsyncTeacher): The teacher
+            options: The other arguments of LearnerImpl
+        """
+        options.setdefault("speculative", True)
+        options.setdefault("saturation", Saturation.BATCHED)
+        self.teacher = _BlockingTeacher(teacher)
+        self.learner = LearnerImpl(engine, self.teacher, **options)
+
+    async def run_learner(self) -> List[InclusionAxiom]:
+        """Runs the learner until the hypothesis is equivalent to the target.
+
+        Returns:
+            List[InclusionAxiom]: The hypothesis
+        """
+        self.teacher.loop = asyncio.get_running_loop()
+        return await asyncio.to_thread(self.learner.run_learner)
+
+    async def iter_learner(self, budget: Budget | None = None) -> AsyncIterator[Progress]:
+        """Runs the learner step by step, like `LearnerImpl.iter_learner`.
+
+        Args:
+            budget (Budget | None, optional): Limits for the run. Defaults to no limits.
+
+        Yields:
+            Progress: The progress of the run
+        """
+        self.teacher.loop = asyncio.get_running_loop()
+        steps = self.learner.iter_learner(budget)
+        while True:
+            progress = await asyncio.to_thread(next, steps, None)
+            if progress == None:
+                return
+            yield progress
+
+class _BlockingTeacher:
+    """
+    Implementation of the Teacher protocol for the learner thread. Every query is run as a
+    coroutine on the event loop, and the thread waits for the answer.
+    """
+    def __init__(self, teacher: AsyncTeacher):
+        self.teacher = teacher
+        self.loop: asyncio.AbstractEventLoop | None = None
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        return self._wait(self.teacher.membership_query(axiom))
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        if len(axioms) == 0:
+            return []
+        return self._wait(self.teacher.membership_queries(axioms))
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        return self._wait(self.teacher.equivalence_query(axioms))
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
+
+    def _wait(self, query: Awaitable[Any]) -> Any:
+        assert self.loop != None
+        return asyncio.run_coroutine_threadsafe(query, self.loop).result() # type: ignore[arg-type]
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import List
+import time
+
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.teacher.teacher import Teacher
+
+@dataclass
+class Budget:
+    """Limits for a learning run. None means no limit.
+
+    membership_queries and equivalence_queries limit the number of queries asked to the teacher,
+    and seconds is the wall-clock time the run may take.
+    """
+    membership_queries: int | None = None
+    equivalence_queries: int | None = None
+    seconds: float | None = None
+
+@dataclass
+class Progress:
+    """The state of a learning run after a counter example.
+
+    finished is True once the hypothesis is equivalent to the target. If the run was stopped by
+    the budget, stopped tells which limit was reached.
+    """
+    counter_examples: int
+    membership_queries: int
+    equivalence_queries: int
+    seconds: float
+    hypothesis: List[InclusionAxiom] = field(default_factory=list)
+    finished: bool = False
+    stopped: str | None = None
+
+class BudgetExceeded(Exception):
+    def __init__(self, limit: str):
+        super().__init__(f"The {limit} budget is used up")
+        self.limit = limit
+
+class BudgetTeacher:
+    """
+    Implementation of the Teacher protocol that counts the queries to another teacher, and raises
+    BudgetExceeded before a query that would go over the budget.
+    """
+    def __init__(self, teacher: Teacher, budget: Budget):
+        self.teacher = teacher
+        self.budget = budget
+        self.membership = 0
+        self.equivalence = 0
+        self.start = time.perf_counter()
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        return self.membership_queries([axiom])[0]
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        self._check_time()
+        if self.budget.membership_queries != None and self.membership + len(axioms) > self.budget.membership_queries:
+            raise BudgetExceeded("membership_queries")
+        self.membership += len(axioms)
+        if len(axioms) == 1:
+            return [self.teacher.membership_query(axioms[0])]
+        return self.teacher.membership_queries(axioms)
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        self._check_time()
+        if self.budget.equivalence_queries != None and self.equivalence + 1 > self.budget.equivalence_queries:
+            raise BudgetExceeded("equivalence_queries")
+        self.equivalence += 1
+        return self.teacher.equivalence_query(axioms)
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
+
+    def progress(self, counter_examples: int, hypothesis: List[InclusionAxiom]) -> Progress:
+        return Progress(counter_examples, self.membership, self.equivalence, time.perf_counter() - self.start, hypothesis)
+
+    def _check_time(self) -> None:
+        if self.budget.seconds != None and time.perf_counter() - self.start > self.budget.seconds:
+            raise BudgetExceeded("seconds")
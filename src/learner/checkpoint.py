@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List
+import gzip
+import json
+import os
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, Edge, Node, Role
+
+"""
+Checkpoints of a learning run. A checkpoint is a gzipped JSON file with the hypothesis and the number
+of counter examples handled so far. The answers to membership queries are kept by a CachingTeacher in
+an SQLite database next to it, which is written to as the answers come in.
+"""
+
+@dataclass
+class Checkpoint:
+    hypothesis: List[RightTerminology | LeftTerminology] = field(default_factory=list)
+    counter_examples: int = 0
+
+def answers_path(path: str) -> str:
+    """Gives the path of the database with the answers to membership queries of a checkpoint.
+
+    Args:
+        path (str): The checkpoint
+
+    Returns:
+        str: The path of the database
+    """
+    return path + ".answers"
+
+def save_checkpoint(path: str, checkpoint: Checkpoint) -> None:
+    """Writes a checkpoint. The file is replaced in one step, so a run that dies while writing
+    leaves the previous checkpoint behind.
+
+    Args:
+        path (str): Where the checkpoint is written
+        checkpoint (Checkpoint): The checkpoint
+    """
+    data = {
+        "hypothesis": [_terminology_to_json(a) for a in checkpoint.hypothesis],
+        "counter_examples": checkpoint.counter_examples,
+    }
+    tmp = path + ".tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+def load_checkpoint(path: str) -> Checkpoint:
+    """Reads a checkpoint.
+
+    Args:
+        path (str): Where the checkpoint is
+
+    Returns:
+        Checkpoint: The checkpoint
+    """
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        data = json.load(f)
+    return Checkpoint(
+        [_terminology_from_json(a) for a in data["hypothesis"]],
+        data["counter_examples"],
+    )
+
+def _terminology_to_json(axiom: RightTerminology | LeftTerminology) -> Dict[str, Any]:
+    if isinstance(axiom, RightTerminology):
+        return {"concept": axiom.left.name, "right": _node_to_json(axiom.right)}
+    return {"left": _node_to_json(axiom.left), "concept": axiom.right.name}
+
+def _terminology_from_json(data: Dict[str, Any]) -> RightTerminology | LeftTerminology:
+    if "right" in data:
+        return RightTerminology(ConceptExpression(data["concept"]), _node_from_json(data["right"]))
+    return LeftTerminology(_node_from_json(data["left"]), ConceptExpression(data["concept"]))
+
+def _node_to_json(node: Node) -> List[Any]:
+    return [[c.name for c in node.labels], [[e.label.name, _node_to_json(e.target)] for e in node.edges]]
+
+def _node_from_json(data: List[Any]) -> Node:
+    labels, edges = data
+    return Node([ConceptExpression(c) for c in labels], [Edge(Role(r), _node_from_json(t)) for r, t in edges])
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from dataclasses import dataclass, field, asdict
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, TypeVar
+import json
+import time
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.engine.engine import Engine
+from src.teacher.teacher import Teacher
+
+Hook = Callable[[str, str, int, float], None]
+Method = TypeVar("Method", bound=Callable[..., Any])
+
+@dataclass
+class OperationStats:
+    calls: int = 0
+    items: int = 0
+    seconds: float = 0.0
+
+@dataclass
+class PhaseStats:
+    calls: int = 0
+    seconds: float = 0.0
+    operations: Dict[str, OperationStats] = field(default_factory=dict)
+
+class Instrumentation:
+    """Counts and times the engine and teacher calls of a learning run, broken down by the phase of
+    the learner they were made in.
+
+    Operations are counted in the innermost phase, while the time of a phase includes the phases
+    inside it. A phase entered again inside itself, like a recursive decomposition, is only timed
+    once. Calls outside of any phase are counted in the phase "learner".
+
+    Hooks are called after every operation with the phase, the operation, the number of axioms and
+    the time in seconds.
+    """
+    def __init__(self, path: str | None = None):
+        """
+        Args:
+            path (str | None, optional): Where the JSON report is written at the end of a run. Defaults to None.
+        """
+        self.path = path
+        self.phases: Dict[str, PhaseStats] = {}
+        self.hooks: List[Hook] = []
+        self._stack: List[str] = []
+        self._start = time.perf_counter()
+
+    @property
+    def current_phase(self) -> str:
+        return self._stack[-1] if len(self._stack) > 0 else "learner"
+
+    def add_hook(self, hook: Hook) -> None:
+        self.hooks.append(hook)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Marks the calls made inside the block as part of a phase.
+
+        Args:
+            name (str): The name of the phase
+        """
+        stats = self.phases.setdefault(name, PhaseStats())
+        stats.calls += 1
+        outermost = name not in self._stack
+        self._stack.append(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if outermost:
+                stats.seconds += time.perf_counter() - start
+            self._stack.pop()
+
+    def record(self, operation: str, items: int, seconds: float) -> None:
+        """Records one call of an operation in the current phase.
+
+        Args:
+            operation (str): The operation, for example "entails"
+            items (int): The number of axioms in the call
+            seconds (float): How long the call took
+        """
+        phase = self.current_phase
+        stats = self.phases.setdefault(phase, PhaseStats()).operations.setdefault(operation, OperationStats())
+        stats.calls += 1
+        stats.items += items
+        stats.seconds += seconds
+        for hook in self.hooks:
+            hook(phase, operation, items, seconds)
+
+    @contextmanager
+    def time(self, operation: str, items: int = 1) -> Iterator[None]:
+        """Times the block as one call of an operation.
+
+        Args:
+            operation (str): The operation
+            items (int, optional): The number of axioms in the call. Defaults to 1.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(operation, items, time.perf_counter() - start)
+
+    def report(self) -> Dict[str, Any]:
+        """Gives the numbers of the run so far.
+
+        Returns:
+            Dict[str, Any]: The total time and the stats of each phase
+        """
+        return {
+            "seconds": time.perf_counter() - self._start,
+            "phases": {name: asdict(stats) for name, stats in self.phases.items()},
+        }
+
+    def write_report(self) -> None:
+        """Writes the report to `path` as JSON, if there is a path.
+        """
+        if self.path != None:
+            with open(self.path, "w") as f:
+                json.dump(self.report(), f, indent=2)
+
+
+def phase(name: str) -> Callable[[Method], Method]:
+    """Decorator for learner methods that marks the method as a phase, when the learner has an
+    instrumentation.
+
+    Args:
+        name (str): The name of the phase
+    """
+    def decorator(method: Method) -> Method:
+        @wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if self.instrumentation == None:
+                return method(self, *args, **kwargs)
+            with self.instrumentation.phase(name):
+                return method(self, *args, **kwargs)
+        return wrapper # type: ignore[return-value]
+    return decorator
+
+
+class InstrumentedEngine:
+    """
+    Implementation of the Engine protocol that records the calls to another engine.
+
+    If the wrapped engine has a `reasoner_seconds` counter, like OwlEngine, the time spent in the
+    reasoner is recorded as the operation "reasoner".
+    """
+    def __init__(self, engine: Engine, instrumentation: Instrumentation):
+        self.engine = engine
+        self.instrumentation = instrumentation
+
+    def entails(self, axiom: RightTerminology | LeftTerminology | InclusionAxiom) -> bool:
+        return self._timed(lambda: self.engine.entails(axiom), 1)
+
+    def entails_many(self, axioms: List[RightTerminology | LeftTerminology | InclusionAxiom]) -> List[bool]:
+        return self._timed(lambda: self.engine.entails_many(axioms), len(axioms))
+
+    def _timed(self, check: Callable[[], Any], items: int) -> Any:
+        reasoner = getattr(self.engine, "reasoner_seconds", None)
+        with self.instrumentation.time("entails", items):
+            result = check()
+        if reasoner != None:
+            self.instrumentation.record("reasoner", items, getattr(self.engine, "reasoner_seconds") - reasoner)
+        return result
+
+    def add_axiom(self, axiom: RightTerminology | LeftTerminology):
+        with self.instrumentation.time("add_axiom"):
+            self.engine.add_axiom(axiom)
+
+    def compact(self) -> None:
+        with self.instrumentation.time("compact"):
+            self.engine.compact()
+
+    def close(self) -> None:
+        """Closes the wrapped engine, if it has anything to close, like the reasoner session of OwlEngine.
+        """
+        close = getattr(self.engine, "close", None)
+        if close != None:
+            close()
+
+    def get_hypothesis(self) -> List[RightTerminology | LeftTerminology]:
+        return self.engine.get_hypothesis()
+
+    def get_right_from_hypothesis(self, concept_expression: ConceptExpression) -> RightTerminology | None:
+        return self.engine.get_right_from_hypothesis(concept_expression)
+
+class InstrumentedTeacher:
+    """
+    Implementation of the Teacher protocol that records the queries to another teacher.
+    """
+    def __init__(self, teacher: Teacher, instrumentation: Instrumentation):
+        self.teacher = teacher
+        self.instrumentation = instrumentation
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        with self.instrumentation.time("membership_query"):
+            return self.teacher.membership_query(axiom)
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        with self.instrumentation.time("membership_query", len(axioms)):
+            return self.teacher.membership_queries(axioms)
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        with self.instrumentation.time("equivalence_query", len(axioms)):
+            return self.teacher.equivalence_query(axioms)
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
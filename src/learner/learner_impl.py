@@ -2,18 +2,132 @@ from __future__ import annotations
 
 from src.data.special import RightTerminology, LeftTerminology
 from src.data.communication import InclusionAxiom, Node, ConceptExpression, Edge
+from src.data.taxonomy import ConceptTaxonomy
+from src.data.symbols import SymbolTable
+from src.data.edits import EditLog
+from src.learner.instrumentation import Instrumentation, InstrumentedEngine, InstrumentedTeacher, phase
+from src.learner.checkpoint import Checkpoint, answers_path, save_checkpoint, load_checkpoint
+from src.learner.budget import Budget, BudgetExceeded, BudgetTeacher, Progress
+from src.teacher.cache import CachingTeacher
 from src.teacher.teacher import Teacher
-from typing import List
+from typing import Callable, Iterator, List, Set, Tuple, TypeVar
+from enum import Enum
 import copy
 
 from src.engine.engine import Engine
 
+Query = TypeVar("Query")
+
+class Saturation(Enum):
+    """How the learner saturates the nodes of a counter example.
+    
+    SEQUENTIAL tries one concept at a time.
+    BATCHED checks every concept of a node at once, with batched engine and teacher calls, and
+    then checks the accepted concepts together.
+    GROUP adds a whole block of concepts at once, and only splits the block in two if it fails. This
+    needs about (accepted concepts) * log(concepts) checks, which is fewer when most concepts fail.
+    """
+    SEQUENTIAL = "sequential"
+    BATCHED = "batched"
+    GROUP = "group"
+
 class LearnerImpl:
     """Implementation of the learner. This onn based on the Angluin's exact learning framework.
     """
-    def __init__(self, engine: Engine, teacher: Teacher):
+    def __init__(self, engine: Engine, teacher: Teacher, saturation: Saturation = Saturation.SEQUENTIAL, taxonomy: ConceptTaxonomy | None = None, batch_size: int = 16, instrumentation: Instrumentation | None = None, checkpoint: str | None = None, checkpoint_every: int = 1, speculative: bool = False, compact_every: int | None = None):
+        """
+        Args:
+            engine (Engine): The engine holding the hypothesis
+            teacher (Teacher): The teacher
+            saturation (Saturation, optional): How nodes are saturated. Defaults to Saturation.SEQUENTIAL.
+            taxonomy (ConceptTaxonomy | None, optional): A taxonomy of the concepts. If given, it is used
+                to order the candidate concepts and skip the ones whose answer is already known. With
+                batched saturation every candidate of a node is asked in the same batch, so the
+                taxonomy only orders them there.
+            batch_size (int, optional): How many concepts are checked at once when turning a counter
+                example into a terminology. Defaults to 16.
+            instrumentation (Instrumentation | None, optional): If given, the engine and teacher calls
+                are counted and timed per phase, and the report is written at the end of `run_learner`.
+            checkpoint (str | None, optional): If given, the hypothesis is saved to this file during the
+                run, so it can be continued with `resume`. The answers to membership queries are kept in
+                the database of a CachingTeacher at `answers_path(checkpoint)`, unless the teacher is
+                already a CachingTeacher with a database.
+            checkpoint_every (int, optional): After how many counter examples a checkpoint is saved. Defaults to 1.
+            speculative (bool, optional): If the candidates of `decompose_right` and `sibling_merge` are
+                checked in batches. This gives the same result with a few more membership queries, and
+                is faster with a teacher that answers a batch concurrently. Defaults to False.
+            compact_every (int | None, optional): After how many counter examples the redundant axioms
+                and conjuncts are removed from the hypothesis, if the engine can compact it.
+                Defaults to never.
+        """
+        self.cache: CachingTeacher | None = None
+        if checkpoint != None:
+            if isinstance(teacher, CachingTeacher) and teacher.connection != None:
+                self.cache = teacher
+            else:
+                self.cache = CachingTeacher(teacher, answers_path(checkpoint))
+            teacher = self.cache
+        if instrumentation != None:
+            engine = InstrumentedEngine(engine, instrumentation)
+            teacher = InstrumentedTeacher(teacher, instrumentation)
         self.engine = engine
         self.teacher = teacher
+        self.instrumentation = instrumentation
+        self.saturation = saturation
+        self.taxonomy = taxonomy
+        self.batch_size = batch_size
+        self.checkpoint = checkpoint
+        self.checkpoint_every = checkpoint_every
+        self.speculative = speculative
+        self.compact_every = compact_every
+        self.counter_examples = 0
+        self.committed: Checkpoint | None = None
+        if checkpoint != None:
+            self._commit()
+        self.symbols = SymbolTable()
+        self.edits = EditLog()
+    
+    @staticmethod
+    def resume(path: str, teacher: Teacher, engine: Engine, **options) -> LearnerImpl:
+        """Makes a learner that continues from a checkpoint. The hypothesis is added to the engine,
+        and the membership queries that were already answered are not sent to the teacher again.
+
+        Args:
+            path (str): The checkpoint. The learner keeps saving to it.
+            teacher (Teacher): The teacher
+            engine (Engine): The engine. It should start with an empty hypothesis.
+            options: The other arguments of LearnerImpl
+
+        Returns:
+            LearnerImpl: The learner
+        """
+        checkpoint = load_checkpoint(path)
+        for axiom in checkpoint.hypothesis:
+            engine.add_axiom(axiom)
+        
+        learner = LearnerImpl(engine, teacher, checkpoint=path, **options)
+        learner.counter_examples = checkpoint.counter_examples
+        learner._commit()
+        return learner
+    
+    def compact(self) -> None:
+        """Removes the redundant axioms and conjuncts from the hypothesis, if the engine can.
+        """
+        self.engine.compact()
+    
+    def save_checkpoint(self) -> None:
+        """Saves the hypothesis and the number of counter examples, as they were after the last
+        counter example that was added, to the checkpoint file. The answers to membership queries are
+        already in the database of the cache.
+        """
+        assert self.checkpoint != None and self.committed != None
+        save_checkpoint(self.checkpoint, self.committed)
+    
+    def _commit(self) -> None:
+        """Keeps a copy of the hypothesis for the checkpoint. A run can stop while a counter example
+        is half way learned, and only the state before it may be saved.
+        """
+        self.committed = Checkpoint(copy.deepcopy(self.engine.get_hypothesis()), self.counter_examples)
         
     def run_learner(self) -> List[InclusionAxiom]:
         """Starts running the learner. It uses the given teacher as its teacher.
@@ -21,24 +135,77 @@ class LearnerImpl:
         Returns:
             List[InclusionAxiom]: Returns the discovered ontology as a list of InclusionAxioms
         """
-        
-        # This loops repeats until the teacher does not give back a counterexample
-        while True:
-            counter_example = self.teacher.equivalence_query(self._get_hypothesis())
-            if (counter_example == None):
-                break
-            
-            # After getting a counterexample, the example is tuned into a terminology
-            counter_example = self._terminology_counter_example(counter_example)
-            
-            if isinstance(counter_example, RightTerminology):
-                counter_example = self.right_o_essential(counter_example)
-            else:
-                counter_example = self.left_o_essential(counter_example)
-            
-            self.engine.add_axiom(counter_example)
+        for _ in self.iter_learner():
+            pass
         return self._get_hypothesis()
     
+    def iter_learner(self, budget: Budget | None = None) -> Iterator[Progress]:
+        """Runs the learner step by step. The progress and the current hypothesis are given after
+        each counter example, and once more at the end of the run.
+        
+        The budget is checked before every query to the teacher. When a limit is reached, the
+        counter example being worked on is dropped, and the run ends with the hypothesis so far.
+
+        Args:
+            budget (Budget | None, optional): Limits for the run. Defaults to no limits.
+
+        Yields:
+            Progress: The progress of the run
+        """
+        teacher = self.teacher
+        limited = BudgetTeacher(teacher, budget or Budget())
+        self.teacher = limited
+        stopped: str | None = None
+        
+        try:
+            # This loops repeats until the teacher does not give back a counterexample
+            while True:
+                try:
+                    counter_example = self.teacher.equivalence_query(self._get_hypothesis())
+                    if (counter_example == None):
+                        break
+                    self._add_counter_example(counter_example)
+                except BudgetExceeded as e:
+                    stopped = e.limit
+                    break
+                yield limited.progress(self.counter_examples, self._get_hypothesis())
+        finally:
+            self.teacher = teacher
+        
+        if self.checkpoint != None:
+            self.save_checkpoint()
+        if self.instrumentation != None:
+            self.instrumentation.write_report()
+        
+        progress = limited.progress(self.counter_examples, self._get_hypothesis())
+        progress.finished = stopped == None
+        progress.stopped = stopped
+        yield progress
+    
+    def _add_counter_example(self, counter_example: InclusionAxiom) -> None:
+        """Learns from a counter example, and adds the result to the hypothesis.
+
+        Args:
+            counter_example (InclusionAxiom): The counter example
+        """
+        # After getting a counterexample, the example is tuned into a terminology
+        terminology = self._terminology_counter_example(counter_example)
+        
+        if isinstance(terminology, RightTerminology):
+            terminology = self.right_o_essential(terminology)
+        else:
+            terminology = self.left_o_essential(terminology)
+        
+        self.engine.add_axiom(terminology)
+        
+        self.counter_examples += 1
+        if self.compact_every != None and self.counter_examples % self.compact_every == 0:
+            self.compact()
+        if self.checkpoint != None:
+            self._commit()
+            if self.counter_examples % self.checkpoint_every == 0:
+                self.save_checkpoint()
+    
     def _get_hypothesis(self) -> List[InclusionAxiom]:
         """Gets the hypothesis ontology from the engine
 
@@ -47,6 +214,17 @@ class LearnerImpl:
         """
         return [a.inclusion_axiom() for a in self.engine.get_hypothesis()]
     
+    def _get_concepts(self) -> List[ConceptExpression]:
+        """Gets the concepts from the teacher. If there is a taxonomy, the most general concepts come first.
+
+        Returns:
+            List[ConceptExpression]: The concepts
+        """
+        concepts = self.teacher.get_concepts()
+        if self.taxonomy == None:
+            return concepts
+        return self.taxonomy.order(concepts)
+    
     def _is_concept(self, expression: Node) -> bool:
         """Checks if an expression is a concept expression
 
@@ -58,6 +236,7 @@ class LearnerImpl:
         """
         return len(expression.labels) == 1 and len(expression.edges) == 0
     
+    @phase("counter_example")
     def _terminology_counter_example(self, counter_example: InclusionAxiom) -> RightTerminology | LeftTerminology:
         """Turning the counter example into a terminology.
 
@@ -78,22 +257,72 @@ class LearnerImpl:
         if self._is_concept(counter_example.right):
             return LeftTerminology(counter_example.left, counter_example.right.labels[0])
         
-        # Naively trying to construct a terminology 
-        for n in counter_example.right:
-            for c in self.teacher.get_concepts():
-                r = RightTerminology(c,n)
-                if (self._is_counter_example(r)):
-                    return r
+        # Tries to find a concept C and a node N of the counter example such that C ⊑ N or N ⊑ C is a
+        # counter example. The most promising nodes are tried first, and the concepts in batches.
+        for n in self._rank_nodes(counter_example.right):
+            right = self._first_counter_example(lambda c: RightTerminology(c, n), False)
+            if right != None:
+                return right
         
-        for n in counter_example.left:
-            for c in self.teacher.get_concepts():
-                l = LeftTerminology(n,c)
-                if (self._is_counter_example(l)):
-                    return l
+        for n in self._rank_nodes(counter_example.left):
+            left = self._first_counter_example(lambda c: LeftTerminology(n, c), True)
+            if left != None:
+                return left
         
         raise ValueError("Counter example could not be made into a terminology")
             
         
+    def _rank_nodes(self, expression: Node) -> List[Node]:
+        """Orders the nodes of an expression by how likely they are to give a terminology counter example.
+        Shallow nodes come first, and nodes on the same depth are ordered by how many of their labels
+        are in the signature of the target.
+
+        Args:
+            expression (Node): The expression
+
+        Returns:
+            List[Node]: The nodes of the expression
+        """
+        signature = self.symbols.label_set(self.teacher.get_concepts())
+        
+        ranked: List[Node] = []
+        level = [expression]
+        while len(level) > 0:
+            ranked.extend(sorted(level, key=lambda n: -len(self.symbols.label_set(n.labels) & signature)))
+            level = [e.target for n in level for e in n.edges]
+        return ranked
+    
+    def _first_counter_example(self, terminology: Callable[[ConceptExpression], RightTerminology | LeftTerminology], prune_below: bool) -> RightTerminology | LeftTerminology | None:
+        """Finds the first concept that makes a terminology that is a counter example. The concepts are
+        checked in batches of `batch_size`, and it stops after the first batch with a counter example.
+
+        Args:
+            terminology (Callable[[ConceptExpression], RightTerminology | LeftTerminology]): Makes the terminology for a concept
+            prune_below (bool): If the concepts below a concept can be skipped when the teacher says no to it.
+                This holds when the concept is on the right side of the terminology.
+
+        Returns:
+            RightTerminology | LeftTerminology | None: The counter example. None if there is none.
+        """
+        concepts = self._get_concepts()
+        rejected: Set[ConceptExpression] = set()
+        
+        for i in range(0, len(concepts), self.batch_size):
+            batch = [c for c in concepts[i:i + self.batch_size] if c not in rejected]
+            axioms = [terminology(c) for c in batch]
+            
+            entailed = self.engine.entails_many(axioms)
+            candidates = [j for j, e in enumerate(entailed) if not e]
+            members = self.teacher.membership_queries([axioms[j].inclusion_axiom() for j in candidates])
+            
+            for j, member in zip(candidates, members):
+                if member:
+                    return axioms[j]
+                if prune_below and self.taxonomy != None:
+                    rejected |= self.taxonomy.subsumees(batch[j])
+        
+        return None
+    
     def _is_counter_example(self, axiom: RightTerminology | LeftTerminology) -> bool:
         """Checks if the terminology is still a counter example.
 
@@ -106,6 +335,26 @@ class LearnerImpl:
         """
         return (not self.engine.entails(axiom)) and (self.teacher.membership_query(axiom.inclusion_axiom()))
     
+    def _are_counter_examples(self, axioms: List[RightTerminology | LeftTerminology]) -> List[bool]:
+        """Checks for each terminology if it is still a counter example, like `_is_counter_example`.
+        The engine is asked about all of them at once, and the teacher about the ones that are not entailed.
+
+        Args:
+            axioms (List[RightTerminology | LeftTerminology]): Terminologies
+
+        Returns:
+            List[bool]: true for each terminology that is still a counter example
+        """
+        entailed = self.engine.entails_many(axioms)
+        
+        candidates = [i for i, e in enumerate(entailed) if not e]
+        members = self.teacher.membership_queries([axioms[i].inclusion_axiom() for i in candidates])
+        
+        result = [False] * len(axioms)
+        for i, m in zip(candidates, members):
+            result[i] = m
+        return result
+    
     
     def right_o_essential(self, axiom: RightTerminology) -> RightTerminology:
         """Returns the right_o_essential of the terminology
@@ -123,11 +372,14 @@ class LearnerImpl:
         hyp = self.engine.get_right_from_hypothesis(axiom.left)
         if hyp != None:
             expr = axiom.right
+            labels = self.symbols.label_set(expr.labels)
             for c in hyp.right.labels:
-                if c not in expr.labels:
+                if labels.add(c):
                     expr.labels.append(c)
             
-            expr.edges.extend(hyp.right.edges)
+            # The edges are copied, so the tentative changes to the counter example do not reach the
+            # hypothesis if the run stops half way
+            expr.edges.extend(copy.deepcopy(hyp.right.edges))
             
             axiom = self._right_o_essential(axiom)
         
@@ -148,34 +400,150 @@ class LearnerImpl:
         
         return axiom
     
+    @phase("saturate_right")
     def saturate_right(self, axiom: RightTerminology) -> RightTerminology:
+        if self.saturation != Saturation.SEQUENTIAL:
+            return self._saturate_right_blocks(axiom)
+        
         root = True
         for e in axiom.right:
-            for c in self.teacher.get_concepts():
-                if (root and c == axiom.left) or c in e.labels:
+            rejected: Set[ConceptExpression] = set()
+            labels = self.symbols.label_set(e.labels)
+            for c in self._get_concepts():
+                if (root and c == axiom.left) or c in labels or c in rejected:
                     continue
                 e.labels.append(c)
                 if not self._is_counter_example(axiom):
                     e.labels.pop()
+                    if self.taxonomy != None:
+                        rejected |= self.taxonomy.subsumees(c)
+                    continue
+                labels.add(c)
+                if self.taxonomy != None:
+                    # Everything above c is implied, so it can be added without asking
+                    for b in self.taxonomy.subsumers(c):
+                        if not ((root and b == axiom.left) or b in labels):
+                            e.labels.append(b)
+                            labels.add(b)
             root = False
         return axiom
     
+    @phase("saturate_left")
     def saturate_left(self, axiom: LeftTerminology) -> LeftTerminology:
+        if self.saturation != Saturation.SEQUENTIAL:
+            return self._saturate_left_blocks(axiom)
+        
+        # The expression before the last added concept. It has the same shape, so the nodes of the two
+        # are visited together, and an added concept is added to both.
         org_express = copy.deepcopy(axiom.left)
         
         root = True
-        for e in axiom.left:
+        for e, o in zip(axiom.left, org_express):
+            labels = self.symbols.label_set(e.labels)
             for c in self.teacher.get_concepts():
-                if (root and c == axiom.right) or c in e.labels:
+                if (root and c == axiom.right) or c in labels:
                     continue
                 e.labels.append(c)
                 if not self.engine.entails(InclusionAxiom(org_express, axiom.left)):
                     e.labels.pop()
                 else:
-                    org_express = copy.deepcopy(axiom.left)
+                    labels.add(c)
+                    o.labels.append(c)
+            root = False
+        return axiom
+    
+    def _saturate_right_blocks(self, axiom: RightTerminology) -> RightTerminology:
+        root = True
+        for e in axiom.right:
+            labels = self.symbols.label_set(e.labels)
+            candidates = [c for c in self._get_concepts() if not ((root and c == axiom.left) or c in labels)]
+            rejected: Set[ConceptExpression] | None = set() if self.taxonomy != None else None
+            self._add_labels(e, candidates, lambda: axiom, self._are_counter_examples, rejected)
             root = False
         return axiom
     
+    def _saturate_left_blocks(self, axiom: LeftTerminology) -> LeftTerminology:
+        org_express = copy.deepcopy(axiom.left)
+        
+        root = True
+        for e, o in zip(axiom.left, org_express):
+            labels = self.symbols.label_set(e.labels)
+            candidates = [c for c in self._get_concepts() if not ((root and c == axiom.right) or c in labels)]
+            self._add_labels(e, candidates, lambda: InclusionAxiom(org_express, axiom.left), self.engine.entails_many)
+            o.labels = e.labels.copy()
+            root = False
+        return axiom
+    
+    def _add_labels(self, node: Node, candidates: List[ConceptExpression], query: Callable[[], Query], check: Callable[[List[Query]], List[bool]], rejected: Set[ConceptExpression] | None = None):
+        if self.saturation == Saturation.GROUP:
+            self._add_labels_grouped(node, candidates, query, check, rejected)
+        else:
+            self._add_labels_batched(node, candidates, query, check)
+    
+    def _add_labels_grouped(self, node: Node, candidates: List[ConceptExpression], query: Callable[[], Query], check: Callable[[List[Query]], List[bool]], rejected: Set[ConceptExpression] | None = None):
+        """Adds the candidates to the node that pass the check. The candidates are added as a block,
+        and the block is split in two and tried again if it does not pass.
+        
+        A block passes only if each of its concepts would pass on its own, so the result is the same
+        as trying the concepts one at a time.
+
+        Args:
+            node (Node): The node to add labels to
+            candidates (List[ConceptExpression]): The concepts to try
+            query (Callable[[], Query]): Gives the query for the current state of the expression. It may
+                share nodes with the expression.
+            check (Callable[[List[Query]], List[bool]]): Checks a list of queries
+            rejected (Set[ConceptExpression] | None, optional): If given, the concepts below a concept
+                that fails on its own are added to it, and skipped in the later blocks. Needs a taxonomy.
+        """
+        if rejected != None:
+            candidates = [c for c in candidates if c not in rejected]
+        if len(candidates) == 0:
+            return
+        
+        node.labels.extend(candidates)
+        if check([query()])[0]:
+            return
+        del node.labels[-len(candidates):]
+        
+        if len(candidates) > 1:
+            middle = len(candidates) // 2
+            self._add_labels_grouped(node, candidates[:middle], query, check, rejected)
+            self._add_labels_grouped(node, candidates[middle:], query, check, rejected)
+        elif rejected != None and self.taxonomy != None:
+            rejected |= self.taxonomy.subsumees(candidates[0])
+    
+    def _add_labels_batched(self, node: Node, candidates: List[ConceptExpression], query: Callable[[], Query], check: Callable[[List[Query]], List[bool]]):
+        """Adds the candidates to the node that pass the check. Every candidate is checked on its own
+        with one batched call, and the accepted candidates are then checked together. If they do not
+        pass together, they are tried one at a time.
+
+        Args:
+            node (Node): The node to add labels to
+            candidates (List[ConceptExpression]): The concepts to try
+            query (Callable[[], Query]): Gives the query for the current state of the expression. It may
+                share nodes with the expression.
+            check (Callable[[List[Query]], List[bool]]): Checks a list of queries
+        """
+        # The queries are asked together, so each one is copied before the node is changed again
+        queries: List[Query] = []
+        for c in candidates:
+            node.labels.append(c)
+            queries.append(copy.deepcopy(query()))
+            node.labels.pop()
+        
+        accepted = [c for c, ok in zip(candidates, check(queries)) if ok]
+        node.labels.extend(accepted)
+        if len(accepted) <= 1 or check([query()])[0]:
+            return
+        
+        del node.labels[-len(accepted):]
+        for c in accepted:
+            node.labels.append(c)
+            if not check([query()])[0]:
+                node.labels.pop()
+    
+    @phase("decompose_right")
     def decompose_right(self, right: RightTerminology) -> RightTerminology:
         axiom = right
         root = True
@@ -185,6 +553,19 @@ class LearnerImpl:
                 if (root and c == right.left):
                     continue
                 
+                if self.speculative:
+                    # All edges are checked at once, and the answers are used in the same order as below
+                    edges = list(reversed(n.edges))
+                    members = self.teacher.membership_queries([RightTerminology(c, Node([], [r])).inclusion_axiom() for r in edges])
+                    for r, member in zip(edges, members):
+                        a = RightTerminology(c, Node([], [r]))
+                        if member:
+                            if self.engine.entails(a):
+                                n.edges.pop(next(i for i, e in enumerate(n.edges) if e is r))
+                            else:
+                                return self.decompose_right(a)
+                    continue
+                
                 for i in range(len(n.edges)-1, -1, -1):
                     r = n.edges[i]
                     a = RightTerminology(c, Node([], [r]))
@@ -200,6 +581,7 @@ class LearnerImpl:
         return axiom
     
     
+    @phase("decompose_left")
     def decompose_left(self, left: LeftTerminology) -> LeftTerminology:
         axiom = left
         root = True
@@ -211,25 +593,33 @@ class LearnerImpl:
                     if self._is_counter_example(a):
                         return self.decompose_left(a)
             
-            for i in range(len(n.edges)):
-                roles_copy = n.edges.copy()
-                n.edges.pop(i)
+            # The edges move down when one is removed, so the index only moves on if it is kept
+            i = 0
+            while i < len(n.edges):
+                mark = self.edits.mark()
+                self.edits.remove_edge(n, i)
                 found = False
                 for c in self.teacher.get_concepts():
                     a = LeftTerminology(axiom.left, c)
                     if self._is_counter_example(a):
                         axiom.right = c
-                        roles_copy = n.edges.copy()
                         found = True
                         break
-                if not found:
-                    n.edges = roles_copy
+                if found:
+                    self.edits.commit(mark)
+                else:
+                    self.edits.rollback(mark)
+                    i += 1
             
             root = False
         
         return left
     
+    @phase("sibling_merge")
     def sibling_merge(self, axiom: RightTerminology) -> RightTerminology:
+        if self.speculative:
+            return self._sibling_merge_speculative(axiom)
+        
         exp = axiom.right
         
         for n in exp:
@@ -238,25 +628,62 @@ class LearnerImpl:
                 for j in range(len(roles)-1,i,-1):
                     if (roles[i].label != roles[j].label):
                         continue
-                    new_roles = roles.copy()
-                    new_role = Edge(roles[i].label, self.expression_merge(roles[i].target, roles[j].target))
-                    new_roles.pop(j)
-                    new_roles[i] = new_role
-                    
-                    n.edges = new_roles
+                    mark = self.edits.mark()
+                    self.edits.replace_edge(n, i, Edge(roles[i].label, self.expression_merge(roles[i].target, roles[j].target)))
+                    self.edits.remove_edge(n, j)
                     
                     if self.teacher.membership_query(axiom.inclusion_axiom()):
-                        roles = new_roles
+                        self.edits.commit(mark)
                     else:
-                        n.edges = roles
+                        self.edits.rollback(mark)
                     
         return axiom
-                    
+    
+    def _sibling_merge_speculative(self, axiom: RightTerminology) -> RightTerminology:
+        """Like `sibling_merge`, but for each edge the merges with all later siblings are checked at
+        once. The first accepted merge is used, which is the one `sibling_merge` would have found,
+        and the checks after it are asked again with the merged edges.
+
+        Args:
+            axiom (RightTerminology): The axiom
 
+        Returns:
+            RightTerminology: The axiom with merged siblings
+        """
+        for n in axiom.right:
+            roles = n.edges
+            for i in range(len(roles)-2,-1,-1):
+                j = len(roles) - 1
+                while j > i:
+                    candidates: List[Tuple[int, List[Edge]]] = []
+                    queries: List[InclusionAxiom] = []
+                    for k in range(j, i, -1):
+                        if roles[i].label != roles[k].label:
+                            continue
+                        new_roles = roles.copy()
+                        new_roles[i] = Edge(roles[i].label, self.expression_merge(roles[i].target, roles[k].target))
+                        new_roles.pop(k)
+                        
+                        # The query is copied, since the node is changed again for the next candidate
+                        n.edges = new_roles
+                        candidates.append((k, new_roles))
+                        queries.append(copy.deepcopy(axiom.inclusion_axiom()))
+                    n.edges = roles
+                    
+                    members = self.teacher.membership_queries(queries)
+                    accepted = next(((k, r) for (k, r), m in zip(candidates, members) if m), None)
+                    if accepted == None:
+                        break
+                    j, roles = accepted[0] - 1, accepted[1]
+                    n.edges = roles
+        
+        return axiom
+    
     def expression_merge(self, exp1: Node, exp2: Node) -> Node:
         concepts = exp1.labels.copy()
+        labels = self.symbols.label_set(concepts)
         for c in exp2.labels:
-            if c not in concepts:
+            if labels.add(c):
                 concepts.append(c)
         
         roles = exp1.edges.copy()
@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Protocol
+import asyncio
+import math
+import threading
+
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.teacher.teacher import Teacher
+
+class AsyncTeacher(Protocol):
+    """A teacher that answers queries asynchronously, for example over the network. The learner
+    can keep several queries in flight at once.
+    """
+    async def membership_query(self, axiom: InclusionAxiom) -> bool:
+        """Checks if an axiom is the member of the target ontology
+
+        Args:
+            axiom (InclusionAxiom): the axiom to check against the ontology
+
+        Returns:
+            bool: true if the axiom is a logical consequence of the ontology
+        """
+        ...
+
+    async def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. The queries
+        should be answered concurrently.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        ...
+
+    async def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        """Checks if an hypothesis ontology is equivalent with the target ontology. It gives
+        an counter example if it is not true.
+
+        Args:
+            axioms (List[InclusionAxiom]): The hypothesis ontology to be check against the target.
+
+        Returns:
+            InclusionAxiom | None: If it is not a logical consequence, it returns an counter example.
+            if it is a logical consequence, it returns None.
+        """
+        ...
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        """The learner is responsible to know what concepts expression and roles the ontology consists of.
+
+        Returns:
+            List[ConceptExpression]: The concepts of the ontology.
+        """
+        ...
+
+class ThreadPoolTeacher:
+    """
+    Implementation of the AsyncTeacher protocol that runs a synchronous teacher in a thread pool,
+    so the event loop is not blocked while it answers.
+
+    Most teachers are not safe to call from several threads, so by default the calls take turns.
+    A teacher that is safe, for example one that only waits on I/O, can set `thread_safe`, and a
+    batch of membership queries is then split over the threads.
+    """
+    def __init__(self, teacher: Teacher, max_workers: int = 4, thread_safe: bool = False):
+        self.teacher = teacher
+        self.max_workers = max_workers
+        self.thread_safe = thread_safe
+        self.executor = ThreadPoolExecutor(max_workers)
+        self.lock = threading.Lock()
+
+    async def membership_query(self, axiom: InclusionAxiom) -> bool:
+        return await self._run(self.teacher.membership_query, axiom)
+
+    async def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        if not self.thread_safe or len(axioms) <= 1:
+            return await self._run(self.teacher.membership_queries, axioms)
+
+        chunk_size = math.ceil(len(axioms) / self.max_workers)
+        chunks = [axioms[i:i + chunk_size] for i in range(0, len(axioms), chunk_size)]
+        answers: List[bool] = []
+        for chunk in await asyncio.gather(*(self._run(self.teacher.membership_queries, c) for c in chunks)):
+            answers.extend(chunk)
+        return answers
+
+    async def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        return await self._run(self.teacher.equivalence_query, axioms)
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
+
+    def close(self) -> None:
+        self.executor.shutdown()
+
+    async def _run(self, method: Callable[..., Any], *args: Any) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor, self._call, method, args)
+
+    def _call(self, method: Callable[..., Any], args: Any) -> Any:
+        if self.thread_safe:
+            return method(*args)
+        with self.lock:
+            return method(*args)
@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from typing import Dict, List
+import sqlite3
+
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.teacher.teacher import Teacher
+
+class CachingTeacher:
+    """
+    Implementation of the Teacher protocol that wraps another teacher and memoizes its answers to
+    membership queries. The answers are keyed by the canonical form of the axiom.
+
+    If a path is given, the answers are also kept in an SQLite database, so learning the same target
+    again does not have to ask the wrapped teacher. A database should only be used for one target.
+    """
+    def __init__(self, teacher: Teacher, path: str | None = None):
+        self.teacher = teacher
+        self.answers: Dict[str, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+        self.connection: sqlite3.Connection | None = None
+        if path != None:
+            self.connection = sqlite3.connect(path)
+            self.connection.execute("PRAGMA journal_mode=WAL")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS membership (axiom TEXT PRIMARY KEY, answer INTEGER NOT NULL)")
+            for key, answer in self.connection.execute("SELECT axiom, answer FROM membership"):
+                self.answers[key] = bool(answer)
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        """Checks if an axiom is the member of the target ontology. The wrapped teacher is only
+        asked if the answer is not known.
+
+        Args:
+            axiom (InclusionAxiom): the axiom to check against the ontology
+
+        Returns:
+            bool: true if the axiom is a logical consequence of the ontology
+        """
+        return self.membership_queries([axiom])[0]
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. The axioms with
+        an unknown answer are sent to the wrapped teacher as one list.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        keys = [self._key(a) for a in axioms]
+        missing = [i for i, k in enumerate(keys) if k not in self.answers]
+        self.hits += len(axioms) - len(missing)
+        self.misses += len(missing)
+
+        if len(missing) > 0:
+            answers = self.teacher.membership_queries([axioms[i] for i in missing])
+            for i, answer in zip(missing, answers):
+                self.answers[keys[i]] = answer
+
+            if self.connection != None:
+                with self.connection:
+                    self.connection.executemany("INSERT OR REPLACE INTO membership VALUES (?, ?)", [(keys[i], int(a)) for i, a in zip(missing, answers)])
+
+        return [self.answers[k] for k in keys]
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        return self.teacher.equivalence_query(axioms)
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
+
+    def _key(self, axiom: InclusionAxiom) -> str:
+        left, right = axiom.canonical()
+        return f"{left} ⊑ {right}"
+
+    def close(self) -> None:
+        """Closes the database, if there is one.
+        """
+        if self.connection != None:
+            self.connection.close()
+            self.connection = None
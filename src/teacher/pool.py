@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from typing import Callable, List
+import multiprocessing
+import math
+
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.engine.engine import Engine
+from src.engine.el_engine import ElEngine
+from src.teacher.teacher_impl import OwlTeacher
+
+class PoolTeacher:
+    """
+    Implementation of the Teacher protocol that answers batches of membership queries in parallel.
+
+    Each worker process loads its own OwlTeacher for the target, with its own engine.
+    `membership_queries` spreads the axioms over the workers. Single membership queries and
+    equivalence queries are answered by a teacher in this process, since sending one query to a
+    worker costs more than answering it.
+
+    The engine factory is sent to the workers, so it must be picklable (for example a class, but
+    not a lambda).
+    """
+    def __init__(self, path: str, processes: int | None = None, engine_factory: Callable[[], Engine] = ElEngine):
+        self.teacher = OwlTeacher.load(path, engine_factory)
+        self.processes = processes or multiprocessing.cpu_count()
+
+        context = multiprocessing.get_context("spawn")
+        self.pool = context.Pool(self.processes, initializer=_init_worker, initargs=(path, engine_factory))
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        return self.teacher.membership_query(axiom)
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. The axioms are
+        split into chunks that the workers answer in parallel.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        if len(axioms) == 0:
+            return []
+        chunk_size = math.ceil(len(axioms) / self.processes)
+        chunks = [axioms[i:i + chunk_size] for i in range(0, len(axioms), chunk_size)]
+
+        answers: List[bool] = []
+        for chunk in self.pool.map(_membership_queries, chunks):
+            answers.extend(chunk)
+        return answers
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        return self.teacher.equivalence_query(axioms)
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.teacher.get_concepts()
+
+    def close(self) -> None:
+        """Stops the workers.
+        """
+        self.pool.terminate()
+        self.pool.join()
+
+
+_worker_teacher: OwlTeacher | None = None
+
+def _init_worker(path: str, engine_factory: Callable[[], Engine]) -> None:
+    global _worker_teacher
+    _worker_teacher = OwlTeacher.load(path, engine_factory)
+
+def _membership_queries(axioms: List[InclusionAxiom]) -> List[bool]:
+    assert _worker_teacher != None
+    return _worker_teacher.membership_queries(axioms)
@@ -0,0 +1,232 @@
+from __future__ import annotations
+
+from typing import BinaryIO, List, Tuple
+import os
+import socket
+import socketserver
+import threading
+
+from src.data.codec import Reader, Writer, write_varint
+from src.data.communication import InclusionAxiom, ConceptExpression
+from src.teacher.teacher import Teacher
+
+"""
+A teacher served over a socket, so the learner and the teacher can run in different processes or
+on different hosts.
+
+Every message is a frame: a varint with the length, then the payload. A request starts with the
+operation, and a response with OK or ERROR. Expressions are encoded with src/data/codec.py, with one
+Writer and Reader pair for each direction of a connection. Responses come in the order of the
+requests, so a client can send several requests before reading the answers.
+"""
+
+MEMBERSHIP = 1
+MEMBERSHIPS = 2
+EQUIVALENCE = 3
+CONCEPTS = 4
+
+OK = 0
+ERROR = 1
+
+Address = str | Tuple[str, int]
+
+class TeacherServer:
+    """Serves a teacher on a Unix socket (if the address is a path) or a TCP socket. Every connection
+    is handled in its own thread, and the calls to the teacher take turns.
+    """
+    def __init__(self, teacher: Teacher, address: Address):
+        self.teacher = teacher
+        self.lock = threading.Lock()
+        self.thread: threading.Thread | None = None
+
+        server_class = _UnixServer if isinstance(address, str) else _TcpServer
+        self.server = server_class(address, _Handler) # type: ignore[arg-type]
+        self.server.teacher_server = self # type: ignore[attr-defined]
+
+    @property
+    def address(self) -> Address:
+        return self.server.server_address
+
+    def start(self) -> None:
+        """Serves in a background thread.
+        """
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def serve_forever(self) -> None:
+        self.server.serve_forever()
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+        if isinstance(self.address, str) and os.path.exists(self.address):
+            os.unlink(self.address)
+
+class _UnixServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+class _TcpServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+class _Handler(socketserver.StreamRequestHandler):
+    def setup(self) -> None:
+        super().setup()
+        if self.request.family != socket.AF_UNIX:
+            self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def handle(self) -> None:
+        server: TeacherServer = self.server.teacher_server # type: ignore[attr-defined]
+        reader = Reader()
+        writer = Writer()
+
+        while True:
+            frame = read_frame(self.rfile)
+            if frame == None:
+                return
+            reader.feed(frame)
+            operation = reader.byte()
+
+            try:
+                writer.buffer.append(OK)
+                if operation == MEMBERSHIP:
+                    axiom = reader.axiom()
+                    with server.lock:
+                        writer.bools([server.teacher.membership_query(axiom)])
+                elif operation == MEMBERSHIPS:
+                    axioms = [reader.axiom() for _ in range(reader.varint())]
+                    with server.lock:
+                        writer.bools(server.teacher.membership_queries(axioms))
+                elif operation == EQUIVALENCE:
+                    axioms = [reader.axiom() for _ in range(reader.varint())]
+                    with server.lock:
+                        counter_example = server.teacher.equivalence_query(axioms)
+                    writer.bools([counter_example != None])
+                    if counter_example != None:
+                        writer.axiom(counter_example)
+                elif operation == CONCEPTS:
+                    concepts = server.teacher.get_concepts()
+                    writer.varint(len(concepts))
+                    for c in concepts:
+                        writer.concept(c)
+                else:
+                    raise ValueError(f"Unknown operation {operation}")
+            except Exception as e:
+                # The symbol tables of the two sides may no longer match, so the connection is closed
+                writer.take()
+                writer.buffer.append(ERROR)
+                writer.buffer.extend(repr(e).encode("utf-8"))
+                self.wfile.write(frame_bytes(writer.take()))
+                return
+
+            self.wfile.write(frame_bytes(writer.take()))
+
+class SocketTeacher:
+    """
+    Implementation of the Teacher protocol that sends the queries to a TeacherServer. The connection
+    is kept open, and a batch of membership queries is sent as several requests at once, so the
+    server can start answering before the whole batch has arrived.
+    """
+    def __init__(self, address: Address, batch_size: int = 64):
+        family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+        self.socket = socket.socket(family, socket.SOCK_STREAM)
+        self.socket.connect(address)
+        if family != socket.AF_UNIX:
+            self.socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.file = self.socket.makefile("rb")
+
+        self.batch_size = batch_size
+        self.reader = Reader()
+        self.writer = Writer()
+        self.concepts: List[ConceptExpression] | None = None
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        self.writer.buffer.append(MEMBERSHIP)
+        self.writer.axiom(axiom)
+        self.socket.sendall(frame_bytes(self.writer.take()))
+        return self._response().bools()[0]
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. The axioms are
+        sent in requests of `batch_size`, which are all sent before the answers are read.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        frames = bytearray()
+        chunks = range(0, len(axioms), self.batch_size)
+        for i in chunks:
+            chunk = axioms[i:i + self.batch_size]
+            self.writer.buffer.append(MEMBERSHIPS)
+            self.writer.varint(len(chunk))
+            for a in chunk:
+                self.writer.axiom(a)
+            frames.extend(frame_bytes(self.writer.take()))
+        self.socket.sendall(frames)
+
+        answers: List[bool] = []
+        for _ in chunks:
+            answers.extend(self._response().bools())
+        return answers
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        self.writer.buffer.append(EQUIVALENCE)
+        self.writer.varint(len(axioms))
+        for a in axioms:
+            self.writer.axiom(a)
+        self.socket.sendall(frame_bytes(self.writer.take()))
+
+        response = self._response()
+        if not response.bools()[0]:
+            return None
+        return response.axiom()
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        if self.concepts == None:
+            self.socket.sendall(frame_bytes(bytes([CONCEPTS])))
+            response = self._response()
+            self.concepts = [response.concept() for _ in range(response.varint())]
+        return self.concepts
+
+    def close(self) -> None:
+        self.file.close()
+        self.socket.close()
+
+    def _response(self) -> Reader:
+        frame = read_frame(self.file)
+        if frame == None:
+            raise RuntimeError("The teacher server closed the connection")
+        self.reader.feed(frame)
+        if self.reader.byte() == ERROR:
+            raise RuntimeError("The teacher server failed: " + bytes(frame[1:]).decode("utf-8"))
+        return self.reader
+
+
+def frame_bytes(payload: bytes) -> bytes:
+    header = bytearray()
+    write_varint(header, len(payload))
+    return bytes(header) + payload
+
+def read_frame(file: BinaryIO) -> bytes | None:
+    """Reads one frame.
+
+    Args:
+        file (BinaryIO): A buffered reader of the socket
+
+    Returns:
+        bytes | None: The payload. None if the connection was closed.
+    """
+    length = 0
+    shift = 0
+    while True:
+        byte = file.read(1)
+        if len(byte) == 0:
+            return None
+        length |= (byte[0] & 0x7F) << shift
+        if byte[0] < 0x80:
+            break
+        shift += 7
+    return file.read(length)
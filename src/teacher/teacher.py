@@ -16,6 +16,18 @@ class Teacher(Protocol):
         """
         ...
     
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. Teachers should
+        answer the whole list at once when that is cheaper than answering one by one.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        ...
+    
     def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
         """Checks if an hypothesis ontology is equivalent with the target ontology. It gives
         an counter example if it is not true.
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+from typing import Any, Callable, List
+import copy
+import os
+
+import owlready2
+from owlready2 import Ontology, And, Restriction, Thing, ThingClass
+
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, Edge, Node, InclusionAxiom, Role
+from src.engine.engine import Engine
+from src.engine.el_engine import ElEngine
+from src.data.taxonomy import ConceptTaxonomy
+
+class OwlTeacher:
+    """
+    Implementation of the Teacher protocol for a target ontology loaded with owlready2.
+
+    The EL axioms of the target are added to an engine, which answers the membership queries.
+    Equivalence queries are answered by adding the hypothesis to a new engine, checking all the
+    target axioms against it at once, and giving back the first target axiom that is not entailed.
+    Axioms that are not in EL are left out, and can be found in `unsupported`.
+    """
+    def __init__(self, ontology: Ontology, engine_factory: Callable[[], Engine] = ElEngine):
+        self.ontology = ontology
+        self.engine_factory = engine_factory
+        self.concepts: List[ConceptExpression] = [ConceptExpression(c.name) for c in ontology.classes()]
+        self.axioms: List[InclusionAxiom] = []
+        self.unsupported: List[Any] = []
+
+        for c in ontology.classes():
+            for e in c.is_a:
+                self._add_target_axiom(c, e)
+            for e in c.equivalent_to:
+                self._add_target_axiom(c, e)
+                self._add_target_axiom(e, c)
+
+        for gca in ontology.general_class_axioms():
+            for e in gca.is_a:
+                self._add_target_axiom(gca.left_side, e)
+
+        self.engine = engine_factory()
+        add_inclusion_axioms(self.engine, self.axioms)
+
+    @staticmethod
+    def load(path: str, engine_factory: Callable[[], Engine] = ElEngine) -> OwlTeacher:
+        """Loads the target ontology from an OWL file.
+
+        Args:
+            path (str): Path to the OWL file
+            engine_factory (Callable[[], Engine], optional): Makes the engines used by the teacher. Defaults to ElEngine.
+
+        Returns:
+            OwlTeacher: The teacher for the target
+        """
+        ontology = owlready2.get_ontology("file://" + os.path.abspath(path)).load()
+        return OwlTeacher(ontology, engine_factory)
+
+    def membership_query(self, axiom: InclusionAxiom) -> bool:
+        """Checks if an axiom is the member of the target ontology
+
+        Args:
+            axiom (InclusionAxiom): the axiom to check against the ontology
+
+        Returns:
+            bool: true if the axiom is a logical consequence of the ontology
+        """
+        return self.engine.entails(axiom)
+
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        """Checks for each of the axioms if it is a member of the target ontology. The axioms are
+        sent to the engine as one list.
+
+        Args:
+            axioms (List[InclusionAxiom]): the axioms to check against the ontology
+
+        Returns:
+            List[bool]: true for each axiom that is a logical consequence of the ontology
+        """
+        return self.engine.entails_many(axioms)
+
+    def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
+        """Checks if an hypothesis ontology is equivalent with the target ontology. It gives
+        an counter example if it is not true.
+
+        Args:
+            axioms (List[InclusionAxiom]): The hypothesis ontology to be check against the target.
+
+        Returns:
+            InclusionAxiom | None: If it is not a logical consequence, it returns an counter example.
+            if it is a logical consequence, it returns None.
+        """
+        hypothesis = self.engine_factory()
+        add_inclusion_axioms(hypothesis, axioms)
+
+        for axiom, entailed in zip(self.axioms, hypothesis.entails_many(self.axioms)):
+            if not entailed:
+                # The learner changes the counter example, so it gets its own copy
+                return copy.deepcopy(axiom)
+        return None
+
+    def get_concepts(self) -> List[ConceptExpression]:
+        return self.concepts
+
+    def get_taxonomy(self) -> ConceptTaxonomy:
+        """Gives the taxonomy of the concepts in the target, computed by the teachers engine.
+
+        Returns:
+            ConceptTaxonomy: The taxonomy
+        """
+        return ConceptTaxonomy.from_engine(self.engine, self.concepts)
+
+    def _add_target_axiom(self, left: Any, right: Any) -> None:
+        if right is Thing:
+            return
+
+        left_node = owl_to_node(left)
+        right_node = owl_to_node(right)
+        if left_node == None or right_node == None:
+            self.unsupported.append((left, right))
+            return
+        self.axioms.append(InclusionAxiom(left_node, right_node))
+
+
+def owl_to_node(expression: Any) -> Node | None:
+    """Converts an owlready2 class expression into a Node.
+
+    Args:
+        expression (Any): The class expression
+
+    Returns:
+        Node | None: The expression as a Node. None if the expression is not in EL.
+    """
+    if expression is Thing:
+        return Node([], [])
+
+    if isinstance(expression, ThingClass):
+        return Node([ConceptExpression(expression.name)], [])
+
+    if isinstance(expression, And):
+        node = Node([], [])
+        for c in expression.Classes:
+            conjunct = owl_to_node(c)
+            if conjunct == None:
+                return None
+            node.labels.extend(l for l in conjunct.labels if l not in node.labels)
+            node.edges.extend(conjunct.edges)
+        return node
+
+    if isinstance(expression, Restriction) and expression.type == owlready2.SOME:
+        target = owl_to_node(expression.value)
+        if target == None:
+            return None
+        return Node([], [Edge(Role(expression.property.name), target)])
+
+    return None
+
+def add_inclusion_axioms(engine: Engine, axioms: List[InclusionAxiom]) -> None:
+    """Adds general inclusion axioms to an engine. Engines only take terminologies, so an axiom with
+    complex expressions on both sides is split in two with a fresh concept in the middle.
+
+        C ⊑ D  becomes  C ⊑ X  and  X ⊑ D
+
+    Args:
+        engine (Engine): The engine
+        axioms (List[InclusionAxiom]): The axioms to add
+    """
+    for i, axiom in enumerate(axioms):
+        if len(axiom.left.labels) == 1 and len(axiom.left.edges) == 0:
+            engine.add_axiom(RightTerminology(axiom.left.labels[0], axiom.right))
+        elif len(axiom.right.labels) == 1 and len(axiom.right.edges) == 0:
+            engine.add_axiom(LeftTerminology(axiom.left, axiom.right.labels[0]))
+        else:
+            fresh = ConceptExpression(f"InclusionAxiom{i}")
+            engine.add_axiom(LeftTerminology(axiom.left, fresh))
+            engine.add_axiom(RightTerminology(fresh, axiom.right))
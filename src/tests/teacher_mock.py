@@ -19,6 +19,9 @@ class MockTeacher:
         
         raise ValueError()
     
+    def membership_queries(self, axioms: List[InclusionAxiom]) -> List[bool]:
+        return [self.membership_query(a) for a in axioms]
+    
     def equivalence_query(self, axioms: List[InclusionAxiom]) -> InclusionAxiom | None:
         ...
     
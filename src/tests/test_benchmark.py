@@ -0,0 +1,50 @@
+import pytest
+import dataclasses
+
+from src.benchmark.generator import GeneratorConfig, generate_terminology
+from src.benchmark.harness import COUNTS, BenchmarkCase, compare, run_case
+from src.data.special import RightTerminology
+
+def test_generate_terminology():
+    config = GeneratorConfig(concepts=15, roles=2, axioms=20, depth=3, fan_out=3, left_ratio=0.5, seed=4)
+    axioms = generate_terminology(config)
+    
+    assert len(axioms) == 20
+    assert [a.inclusion_axiom().canonical() for a in axioms] == [a.inclusion_axiom().canonical() for a in generate_terminology(config)]
+    
+    # Every axiom goes from lower to higher numbered concepts
+    for a in axioms:
+        if isinstance(a, RightTerminology):
+            i = int(a.left.name[len("Concept"):])
+            assert all(int(c.name[len("Concept"):]) > i for n in a.right for c in n.labels)
+        else:
+            i = int(a.right.name[len("Concept"):])
+            assert all(int(c.name[len("Concept"):]) < i for n in a.left for c in n.labels)
+
+def test_run_case(tmp_path):
+    case = BenchmarkCase("test", GeneratorConfig(concepts=8, axioms=8, seed=5))
+    result = run_case(case, "el", "owl", str(tmp_path))
+    
+    assert result.key == "test/el/owl"
+    assert result.membership_queries > 0
+    assert result.equivalence_queries > 0
+    assert result.peak_memory > 0
+    
+    assert compare([result], {}) == []
+    assert compare([result], {result.key: {field: getattr(result, field) for field in COUNTS}}) == []
+    
+    # Only the counts are compared, as the time depends on the machine
+    baseline = {field: getattr(result, field) for field in COUNTS}
+    baseline["membership_queries"] -= 1
+    slower = dataclasses.replace(result, seconds=result.seconds * 4)
+    assert len(compare([slower], {result.key: baseline})) == 1
+
+def test_run_case_cached(tmp_path):
+    """The cached teacher should only count the queries that reach the wrapped teacher
+    """
+    case = BenchmarkCase("test", GeneratorConfig(concepts=8, axioms=8, seed=5))
+    result = run_case(case, "el", "owl", str(tmp_path))
+    cached = run_case(case, "el", "cached", str(tmp_path))
+    
+    assert 0 < cached.membership_queries < result.membership_queries
+    assert cached.entailment_checks == result.entailment_checks
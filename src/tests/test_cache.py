@@ -0,0 +1,86 @@
+import pytest
+
+from src.tests.expression_parser import expr
+from src.tests.teacher_mock import MockTeacher
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, InclusionAxiom
+from src.engine.el_engine import ElEngine
+from src.engine.cache import CachingEngine, EntailmentCache, axiom_key
+from src.teacher.cache import CachingTeacher
+
+def test_axiom_key():
+    """Axioms that only differ in the order of labels and edges get the same key
+    """
+    a = RightTerminology(ConceptExpression("A"), expr("B", "C", {"r": ["D"]}, {"s": []}))
+    b = InclusionAxiom(expr("A"), expr({"s": []}, "C", {"r": ["D"]}, "B"))
+
+    assert axiom_key(a) == axiom_key(b)
+    assert axiom_key(a) != axiom_key(LeftTerminology(expr("B", "C", {"r": ["D"]}, {"s": []}), ConceptExpression("A")))
+
+def test_cache_versions():
+    """Negative answers are only valid for the version they were answered for
+    """
+    cache = EntailmentCache()
+
+    cache.put("yes", 0, True)
+    cache.put("no", 0, False)
+
+    assert cache.get("yes", 1) == True
+    assert cache.get("no", 0) == False
+    assert cache.get("no", 1) == None
+    assert cache.hits == 2
+    assert cache.misses == 1
+
+def test_cache_eviction():
+    cache = EntailmentCache(max_size=2)
+
+    cache.put("a", 0, True)
+    cache.put("b", 0, True)
+    cache.get("a", 0)
+    cache.put("c", 0, True)
+
+    assert cache.get("b", 0) == None
+    assert cache.get("a", 0) == True
+
+def test_caching_engine():
+    engine = CachingEngine(ElEngine())
+
+    # Mother ⊑ Parent
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+
+    axiom = RightTerminology(ConceptExpression("Mother"), expr("Parent", "Woman"))
+    assert not engine.entails(axiom)
+    assert not engine.entails(axiom)
+    assert engine.hits == 1
+
+    # Mother ⊑ Woman
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Woman")))
+
+    assert engine.entails(axiom)
+    assert engine.entails_many([axiom, RightTerminology(ConceptExpression("Mother"), expr("Woman", "Parent"))]) == [True, True]
+    assert engine.hits == 3
+    assert engine.misses == 2
+
+def test_caching_teacher(tmp_path):
+    """Answers are memoized, and kept between runs when there is a database
+    """
+    teacher_engine = ElEngine()
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    mock = MockTeacher(teacher_engine, [ConceptExpression("Mother"), ConceptExpression("Parent")])
+
+    path = str(tmp_path / "answers.db")
+    teacher = CachingTeacher(mock, path)
+
+    assert teacher.membership_query(InclusionAxiom(expr("Mother"), expr("Parent")))
+    assert not teacher.membership_query(InclusionAxiom(expr("Parent"), expr("Mother")))
+    assert teacher.membership_query(RightTerminology(ConceptExpression("Mother"), expr("Parent")).inclusion_axiom())
+    assert teacher.hits == 1
+    assert teacher.misses == 2
+    teacher.close()
+
+    # A new run with a teacher that would not answer the same way
+    teacher = CachingTeacher(MockTeacher(ElEngine(), []), path)
+
+    assert teacher.membership_query(InclusionAxiom(expr("Mother"), expr("Parent")))
+    assert teacher.misses == 0
+    teacher.close()
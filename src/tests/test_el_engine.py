@@ -0,0 +1,189 @@
+import pytest
+import random
+
+from src.tests.expression_parser import expr
+from src.tests.teacher_mock import MockTeacher
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, InclusionAxiom, Node, Edge, Role
+from src.engine.el_engine import ElEngine
+from src.learner.learner_impl import LearnerImpl
+
+def test_entails_left():
+    """Testing if entails works for Left axioms (EL_lhs)
+    """
+    engine = ElEngine()
+
+    # Mother ⊑ ∃.parent_of.Mother
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": ["Mother"]})))
+
+    # entails: Mother ⊑ ∃.parent_of.⊤
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": []})))
+    # does not entail: Mother ⊑ ∃.parent_of.Father
+    assert not engine.entails(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": ["Father"]})))
+    # entails: Mother ⊑ ∃.parent_of.(∃.parent_of.⊤)
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": [{"parent_of": []}]})))
+
+def test_entails_right():
+    """Testing if entails works for Right axioms (EL_rhs)
+    """
+    engine = ElEngine()
+
+    # ∃.parent_of.Parent ⊑ Parent
+    # Mother ⊑ Parent
+    engine.add_axiom(LeftTerminology(expr({"parent_of": ["Parent"]}), ConceptExpression("Parent")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+
+    # entails: ∃.parent_of.Mother ⊑ Parent
+    assert engine.entails(LeftTerminology(expr({"parent_of": ["Mother"]}), ConceptExpression("Parent")))
+    # does not etail: ∃.parent_of.⊤ ⊑ Parent
+    assert not engine.entails(LeftTerminology(expr({"parent_of": []}), ConceptExpression("Parent")))
+
+def test_entails_inclusion_axiom():
+    """Testing entailment of general inclusions with conjunctions on both sides
+    """
+    engine = ElEngine()
+
+    # A ⊓ B ⊑ C
+    # C ⊑ ∃.r.(D ⊓ E)
+    # ∃.r.D ⊑ F
+    engine.add_axiom(LeftTerminology(expr("A", "B"), ConceptExpression("C")))
+    engine.add_axiom(RightTerminology(ConceptExpression("C"), expr("D", {"r": ["D", "E"]})))
+    engine.add_axiom(LeftTerminology(expr({"r": ["D"]}), ConceptExpression("F")))
+
+    # entails: A ⊓ B ⊑ F ⊓ ∃.r.E
+    assert engine.entails(InclusionAxiom(expr("A", "B"), expr("F", {"r": ["E"]})))
+    # does not entail: A ⊑ F
+    assert not engine.entails(InclusionAxiom(expr("A"), expr("F")))
+    # entails: ∃.s.(A ⊓ B) ⊑ ∃.s.(∃.r.(D ⊓ E))
+    assert engine.entails(InclusionAxiom(expr({"s": ["A", "B"]}), expr({"s": [{"r": ["D", "E"]}]})))
+    # entails: A ⊑ ⊤
+    assert engine.entails(InclusionAxiom(expr("A"), expr()))
+
+def test_entails_top():
+    """Testing an axiom with ⊤ on the left side
+    """
+    engine = ElEngine()
+
+    # ⊤ ⊑ ∃.r.A
+    engine.add_axiom(LeftTerminology(expr(), ConceptExpression("Thing")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Thing"), expr({"r": ["A"]})))
+
+    assert engine.entails(InclusionAxiom(expr("B"), expr({"r": ["A"]})))
+    assert engine.entails(InclusionAxiom(expr(), expr({"r": [{"r": ["A"]}]})))
+
+def test_hypothesis_is_copied():
+    """The learner keeps changing expressions, which should not change what the engine entails
+    """
+    engine = ElEngine()
+
+    axiom = RightTerminology(ConceptExpression("A"), expr("B"))
+    engine.add_axiom(axiom)
+    axiom.right.labels.append(ConceptExpression("C"))
+
+    assert not engine.entails(RightTerminology(ConceptExpression("A"), expr("C")))
+
+def test_hypothesis_keeps_left_terminologies():
+    """Left terminologies with the same concept are all part of the hypothesis, while a right
+    terminology replaces the one before it
+    """
+    engine = ElEngine()
+
+    engine.add_axiom(LeftTerminology(expr({"r": []}), ConceptExpression("A")))
+    engine.add_axiom(LeftTerminology(expr("B", "C"), ConceptExpression("A")))
+    engine.add_axiom(LeftTerminology(expr({"r": []}), ConceptExpression("A")))
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("B")))
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("B", "C")))
+
+    assert len(engine.get_hypothesis()) == 3
+
+def test_learner_right_decomposition():
+    """The engine should be a drop in replacement for OwlEngine in the learner
+    """
+    teacher_engine = ElEngine()
+    teacher = MockTeacher(teacher_engine, [ConceptExpression("Woman"), ConceptExpression("Human")])
+
+    engine = ElEngine()
+    learner = LearnerImpl(engine, teacher)
+
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Woman"), expr("Human")))
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Human"), expr({"hasParent": ["Human"]})))
+
+    counter_example = RightTerminology(ConceptExpression("Woman"), expr("Human", {"hasParent": ["Human", {"hasParent": ["Human"]}]}))
+    axiom = learner.decompose_right(counter_example)
+
+    assert axiom == RightTerminology(ConceptExpression("Human"), expr({"hasParent": ["Human"]}))
+
+def _random_node(rng: random.Random, depth: int) -> Node:
+    labels = [ConceptExpression(c) for c in rng.sample(["A", "B", "C", "D"], rng.randint(0, 2))]
+    edges = []
+    if depth > 0:
+        for _ in range(rng.randint(0, 2)):
+            edges.append(Edge(Role(rng.choice(["r", "s"])), _random_node(rng, depth - 1)))
+    return Node(labels, edges)
+
+def test_incremental_matches_classification():
+    """The incremental completion should give the same answers as classifying from scratch
+    """
+    rng = random.Random(0)
+
+    for _ in range(20):
+        incremental = ElEngine()
+        scratch = ElEngine(incremental=False)
+
+        for _ in range(4):
+            concept = ConceptExpression(rng.choice(["A", "B", "C", "D"]))
+            if rng.random() < 0.5:
+                axiom = RightTerminology(concept, _random_node(rng, 2))
+            else:
+                axiom = LeftTerminology(_random_node(rng, 2), concept)
+            incremental.add_axiom(axiom)
+            scratch.add_axiom(axiom)
+
+            for _ in range(5):
+                query = InclusionAxiom(_random_node(rng, 2), _random_node(rng, 2))
+                mark = incremental.completion.mark()
+                assert incremental.entails(query) == scratch.entails(query)
+                assert incremental.completion.mark() == mark
+
+def test_entails_many():
+    """Testing entailment of several axioms at once
+    """
+    engine = ElEngine()
+
+    # Mother ⊑ Parent
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+
+    assert engine.entails_many([
+        RightTerminology(ConceptExpression("Mother"), expr("Parent")),
+        LeftTerminology(expr("Parent"), ConceptExpression("Mother")),
+    ]) == [True, False]
+
+def test_compact():
+    engine = ElEngine()
+    
+    # A ⊑ B ⊓ ∃.r.D, B ⊑ C, ∃.r.D ⊑ F, B ⊓ ∃.r.D ⊑ F
+    # A ⊑ C ⊓ B ⊓ ∃.r.D ⊓ ∃.r.(D ⊓ E) replaces the first axiom in the hypothesis, but not in the reasoning
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("B", {"r": ["D"]})))
+    engine.add_axiom(RightTerminology(ConceptExpression("B"), expr("C")))
+    engine.add_axiom(LeftTerminology(expr({"r": ["D"]}), ConceptExpression("F")))
+    engine.add_axiom(LeftTerminology(expr("B", {"r": ["D"]}), ConceptExpression("F")))
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("C", "B", {"r": ["D"]}, {"r": ["D", "E"]})))
+    
+    queries = [
+        RightTerminology(ConceptExpression("A"), expr("C", "F", {"r": ["E"]})),
+        LeftTerminology(expr("B", {"r": ["D", "E"]}), ConceptExpression("F")),
+        RightTerminology(ConceptExpression("B"), expr("F")),
+        RightTerminology(ConceptExpression("C"), expr("B")),
+    ]
+    before = engine.entails_many(queries)
+    
+    engine.compact()
+    
+    # A ⊑ B ⊓ ∃.r.(D ⊓ E), B ⊑ C, ∃.r.D ⊑ F
+    assert {a.inclusion_axiom().canonical() for a in engine.get_hypothesis()} == {
+        InclusionAxiom(expr("A"), expr("B", {"r": ["D", "E"]})).canonical(),
+        InclusionAxiom(expr("B"), expr("C")).canonical(),
+        InclusionAxiom(expr({"r": ["D"]}), expr("F")).canonical(),
+    }
+    assert len(engine.axioms) == 3
+    assert engine.entails_many(queries) == before == [True, True, False, False]
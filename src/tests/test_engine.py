@@ -1,11 +1,14 @@
 import pytest
+import subprocess
 import owlready2
+from owlready2 import And
 
 from src.tests.expression_parser import expr
 from src.data.special import RightTerminology, LeftTerminology
-from src.engine.engine_impl import OwlEngine
+import src.engine.engine_impl
+from src.engine.engine_impl import OwlEngine, OntologyMap
 
-from src.data.communication import ConceptExpression
+from src.data.communication import ConceptExpression, InclusionAxiom
 
 def test_add_right_axiom_with_left_concept():
     onto = owlready2.get_ontology("http://test.org/onto.owl")
@@ -146,3 +149,262 @@ def test_entails_left_right():
     assert engine.entails(LeftTerminology(expr("Mother"), ConceptExpression("Parent")))
                           
     onto.destroy()
+
+def test_warm_session():
+    """Testing entailment through a HermiT session that is kept alive, and that it restarts if it dies
+    """
+    pytest.importorskip("jpype")
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto, warm_session=True)
+    
+    # ∃.parent_of.Parent ⊑ Parent
+    # Mother ⊑ Parent
+    engine.add_axiom(LeftTerminology(expr({"parent_of": ["Parent"]}), ConceptExpression("Parent")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    
+    # entails: ∃.parent_of.Mother ⊑ Parent
+    assert engine.entails(LeftTerminology(expr({"parent_of": ["Mother"]}), ConceptExpression("Parent")))
+    # does not etail: ∃.parent_of.⊤ ⊑ Parent
+    assert not engine.entails(LeftTerminology(expr({"parent_of": []}), ConceptExpression("Parent")))
+    
+    assert engine.session != None
+    engine.session._process.kill()
+    engine.session._process.join()
+    
+    # Mother ⊑ ∃.parent_of.Mother
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": ["Mother"]})))
+    
+    # entails: Mother ⊑ ∃.parent_of.(Parent ⊓ ∃.parent_of.⊤)
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr({"parent_of": ["Parent", {"parent_of": []}]})))
+    assert engine.entails(LeftTerminology(expr({"parent_of": ["Mother"]}), ConceptExpression("Parent")))
+    
+    engine.close()
+    onto.destroy()
+
+def test_warm_session_start_failure(monkeypatch):
+    """Testing that a worker that dies while loading gives a clear error
+    """
+    pytest.importorskip("jpype")
+    import src.engine.hermit_session
+    monkeypatch.setattr(src.engine.hermit_session, "_jvm_path", lambda: "/nonexistent/libjvm.so")
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto, warm_session=True)
+    
+    with pytest.raises(RuntimeError, match="could not be started"):
+        engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    assert engine.session != None and not engine.session.is_alive()
+    
+    onto.destroy()
+
+def test_entails_many():
+    """Testing entailment of several axioms with one reasoner run
+    """
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    # ∃.parent_of.Parent ⊑ Parent
+    # Mother ⊑ Parent
+    engine.add_axiom(LeftTerminology(expr({"parent_of": ["Parent"]}), ConceptExpression("Parent")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    
+    entails = engine.entails_many([
+        LeftTerminology(expr({"parent_of": ["Mother"]}), ConceptExpression("Parent")),
+        LeftTerminology(expr({"parent_of": []}), ConceptExpression("Parent")),
+        RightTerminology(ConceptExpression("Mother"), expr("Parent")),
+        InclusionAxiom(expr("Mother", {"parent_of": ["Mother"]}), expr("Parent")),
+        InclusionAxiom(expr({"parent_of": ["Parent"]}), expr("Mother")),
+    ])
+    
+    assert entails == [True, False, True, True, False]
+    # The temporary classes are not part of the hypothesis
+    assert len(engine.get_hypothesis()) == 2
+    
+    onto.destroy()
+
+def test_entails_no_side_effects():
+    """Testing that entailment checks do not change the hypothesis ontology
+    """
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    # Mother ⊑ Parent
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    triples = set(onto.get_triples())
+    
+    entails = engine.entails_many([
+        InclusionAxiom(expr("Mother", {"parent_of": ["Child"]}), expr("Parent")),
+        InclusionAxiom(expr(), expr("Parent")),
+        RightTerminology(ConceptExpression("Father"), expr("Parent")),
+    ])
+    
+    assert entails == [True, False, False]
+    assert set(onto.get_triples()) == triples
+    assert onto["Child"] == None and onto["parent_of"] == None
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    
+    onto.destroy()
+
+def test_compact():
+    """Testing that compacting removes the redundant and replaced axioms from the owlready2 ontology
+    """
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    # Mother ⊑ Parent ⊓ ∃.parent_of.⊤, Parent ⊑ Person, ∃.parent_of.⊤ ⊑ Parent, Person ⊓ ∃.parent_of.⊤ ⊑ Parent
+    # Mother ⊑ Person ⊓ Parent ⊓ ∃.parent_of.Child replaces the first axiom
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent", {"parent_of": []})))
+    engine.add_axiom(RightTerminology(ConceptExpression("Parent"), expr("Person")))
+    engine.add_axiom(LeftTerminology(expr({"parent_of": []}), ConceptExpression("Parent")))
+    engine.add_axiom(LeftTerminology(expr("Person", {"parent_of": []}), ConceptExpression("Parent")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Person", "Parent", {"parent_of": ["Child"]})))
+    
+    engine.compact()
+    
+    # Mother ⊑ ∃.parent_of.Child, Parent ⊑ Person, ∃.parent_of.⊤ ⊑ Parent
+    assert len(engine.get_hypothesis()) == 3
+    assert onto.Mother.is_a == [owlready2.Thing, onto.parent_of.some(onto.Child)]
+    assert onto.Parent.is_a == [owlready2.Thing, onto.Person]
+    assert len(list(onto.general_class_axioms())) == 1
+    
+    # entails: Mother ⊑ Person
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Person")))
+    # does not entail: Person ⊑ Parent
+    assert not engine.entails(RightTerminology(ConceptExpression("Person"), expr("Parent")))
+    
+    onto.destroy()
+
+def test_compact_keeps_ontology():
+    """Testing that compacting only removes what the engine wrote into the ontology
+    """
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    with onto:
+        class Person(owlready2.Thing):
+            pass
+        class Woman(Person):
+            pass
+    
+    engine = OwlEngine(onto)
+    
+    engine.add_axiom(RightTerminology(ConceptExpression("Woman"), expr("Adult")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Woman"), expr("Adult", "Female")))
+    
+    engine.compact()
+    
+    assert onto.Woman.is_a == [onto.Person, And([onto.Adult, onto.Female])]
+    
+    onto.destroy()
+
+def test_entails_reflexive(monkeypatch):
+    """Testing that a class is subsumed by itself. The reasoner does not report this, so it is
+    replaced by one that reports nothing, and java is not needed.
+    """
+    monkeypatch.setattr(src.engine.engine_impl, "_classify", lambda ontologies: {})
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Mother")))
+    assert engine.entails(InclusionAxiom(expr("Mother"), expr("Mother")))
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr()))
+    assert not engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    
+    onto.destroy()
+
+def test_classify_inconsistent(monkeypatch):
+    """Testing that the scratch ontology is saved without its imports, and that HermiT failing on
+    an inconsistent ontology gives owlready2's error. Java is replaced, so it is not needed.
+    """
+    saved = []
+    def check_output(command, stderr=None):
+        with open(command[-1][len("file:///"):], "rb") as f:
+            saved.append(f.read())
+        raise subprocess.CalledProcessError(1, command, output=b"Inconsistent ontology")
+    monkeypatch.setattr(subprocess, "check_output", check_output)
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    with pytest.raises(owlready2.OwlReadyInconsistentOntologyError):
+        engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    assert len(saved) == 1 and b"owl#imports" not in saved[0]
+    
+    onto.destroy()
+
+def test_ontology_map():
+    """Testing that left terminologies of the same concept are kept side by side, unless the
+    expressions are the same, while a right terminology replaces the one before it
+    """
+    ontology_map = OntologyMap({}, {})
+    
+    ontology_map.add_axiom(LeftTerminology(expr({"eats": []}), ConceptExpression("Animal")))
+    ontology_map.add_axiom(LeftTerminology(expr("Mother", "Parent"), ConceptExpression("Animal")))
+    ontology_map.add_axiom(LeftTerminology(expr("Parent", "Mother"), ConceptExpression("Animal")))
+    ontology_map.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    ontology_map.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent", "Animal")))
+    
+    assert ontology_map.get_list() == [
+        LeftTerminology(expr({"eats": []}), ConceptExpression("Animal")),
+        LeftTerminology(expr("Parent", "Mother"), ConceptExpression("Animal")),
+        RightTerminology(ConceptExpression("Mother"), expr("Parent", "Animal")),
+    ]
+
+def test_add_axiom_replaces_right():
+    """Testing that a right terminology replaces the one with the same concept, and a left
+    terminology does not, as the Engine protocol says
+    """
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    engine.add_axiom(RightTerminology(ConceptExpression("Mother"), expr("Parent", "Woman")))
+    engine.add_axiom(LeftTerminology(expr("Woman", "Parent"), ConceptExpression("Mother")))
+    engine.add_axiom(LeftTerminology(expr("Woman", {"hasChild": []}), ConceptExpression("Mother")))
+    
+    assert engine.get_right_from_hypothesis(ConceptExpression("Mother")) == RightTerminology(ConceptExpression("Mother"), expr("Parent", "Woman"))
+    assert len(engine.get_hypothesis()) == 3
+    
+    onto.destroy()
+
+def test_entails_many_empty(monkeypatch):
+    """Testing that an empty list is answered without running the reasoner
+    """
+    def classify(ontologies):
+        raise AssertionError("the reasoner should not run")
+    monkeypatch.setattr(src.engine.engine_impl, "_classify", classify)
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    
+    engine = OwlEngine(onto)
+    
+    assert engine.entails_many([]) == []
+    
+    onto.destroy()
+
+@pytest.mark.parametrize("warm_session", [False, True])
+def test_entails_imported(warm_session: bool):
+    """Testing that the axioms of the ontologies imported by the hypothesis are used
+    """
+    if warm_session:
+        pytest.importorskip("jpype")
+    base = owlready2.get_ontology("http://test.org/base.owl")
+    onto = owlready2.get_ontology("http://test.org/onto.owl")
+    onto.imported_ontologies.append(base)
+    with base.get_namespace(onto.base_iri):
+        class Parent(owlready2.Thing):
+            pass
+        class Mother(Parent):
+            pass
+    
+    engine = OwlEngine(onto, warm_session=warm_session)
+    
+    assert engine.entails(RightTerminology(ConceptExpression("Mother"), expr("Parent")))
+    assert not engine.entails(RightTerminology(ConceptExpression("Parent"), expr("Mother")))
+    
+    engine.close()
+    onto.destroy()
+    base.destroy()
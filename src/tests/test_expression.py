@@ -1,7 +1,11 @@
 import pytest
+from concurrent.futures import ThreadPoolExecutor
 
 from src.tests.expression_parser import expr
-from src.data.communication import Node, Role, ConceptExpression
+from src.data.communication import Node, Role, ConceptExpression, InclusionAxiom, Edge
+from src.data.symbols import SymbolTable
+from src.data.codec import Reader, Writer
+from src.data.edits import EditLog
 
 def test_iterator():
     exp = expr("1", {"2": ["2"]}, {"3": ["3"]})
@@ -21,4 +25,105 @@ def test_iterator():
     
     assert e is exp.edges[0].target
     
-    assert e.labels[0] == ConceptExpression("3")
\ No newline at end of file
+    assert e.labels[0] == ConceptExpression("3")
+
+def test_canonical():
+    a = expr("A", "B", {"r": ["C", {"s": []}]}, {"r": []})
+    b = expr({"r": []}, "B", {"r": [{"s": []}, "C", "C"]}, "A")
+    
+    assert a.canonical() is b.canonical()
+    assert hash(a.canonical()) == hash(b.canonical())
+    assert a == b
+    assert str(a.canonical()) == "A ⊓ B ⊓ ∃r.(C ⊓ ∃s.⊤) ⊓ ∃r.⊤"
+    assert a.canonical().to_node() == a
+    
+    assert expr("A", {"r": []}).canonical() is not expr("A", {"s": []}).canonical()
+    # The edges are compared as a multiset
+    assert expr({"r": ["A"]}, {"r": ["A"]}) != expr({"r": ["A"]}, {"r": ["B"]})
+    assert expr({"r": ["A"]}, {"r": ["B"]}) != expr({"r": ["A"]}, {"r": ["A"]})
+
+
+def test_canonical_threads():
+    """Threads that make the same new expression at the same time get the same canonical form
+    """
+    for i in range(20):
+        with ThreadPoolExecutor(8) as pool:
+            nodes = list(pool.map(lambda _: expr(f"Thread{i}", {"r": [f"Thread{i}"]}).canonical(), range(64)))
+        assert all(n is nodes[0] for n in nodes)
+
+def test_symbol_table():
+    table = SymbolTable()
+    
+    assert table.concept_id(ConceptExpression("B")) == 0
+    assert table.concept_id(ConceptExpression("A")) == 1
+    assert table.concept_id(ConceptExpression("B")) == 0
+    assert table.concepts == [ConceptExpression("B"), ConceptExpression("A")]
+    
+    # Roles have their own ids
+    assert table.role_id(Role("r")) == 0
+    assert table.roles == [Role("r")]
+
+def test_label_set():
+    table = SymbolTable()
+    a, b, c = ConceptExpression("A"), ConceptExpression("B"), ConceptExpression("C")
+    
+    labels = table.label_set([b, a])
+    assert a in labels and b in labels
+    assert c not in labels and ConceptExpression("D") not in labels
+    assert list(labels) == [b, a]
+    assert len(labels) == 2
+    
+    assert labels.add(c)
+    assert not labels.add(c)
+    assert table.label_set([a, c]) <= labels
+    assert not labels <= table.label_set([a, c])
+    assert list(table.label_set([a]) | table.label_set([c])) == [a, c]
+    assert list(labels - table.label_set([b])) == [a, c]
+    
+    labels.discard(b)
+    assert labels == table.label_set([c, a])
+
+def test_edit_log():
+    log = EditLog()
+    node = expr("A", {"r": ["B"]}, {"s": []}, {"r": ["C"]})
+    original = expr("A", {"r": ["B"]}, {"s": []}, {"r": ["C"]})
+    
+    mark = log.mark()
+    log.add_label(node, ConceptExpression("D"))
+    assert log.remove_edge(node, 1) == Edge(Role("s"), expr())
+    log.replace_edge(node, 0, Edge(Role("r"), expr("B", "C")))
+    log.add_label(node.edges[1].target, ConceptExpression("E"))
+    assert node == expr("A", "D", {"r": ["B", "C"]}, {"r": ["C", "E"]})
+    
+    log.rollback(mark)
+    assert node == original
+    assert [e.label for e in node.edges] == [Role("r"), Role("s"), Role("r")]
+    
+    log.remove_edge(node, 1)
+    inner = log.mark()
+    log.add_label(node, ConceptExpression("D"))
+    log.commit(inner)
+    log.rollback(mark)
+    assert node == expr("A", "D", {"r": ["B"]}, {"s": []}, {"r": ["C"]})
+
+def test_codec():
+    writer = Writer()
+    reader = Reader()
+    node = expr("B", "A", {"r": ["C", {"s": []}]}, {"r": []})
+    axiom = InclusionAxiom(expr("A"), expr("C", {"s": ["B"]}))
+    
+    writer.node(node)
+    writer.axiom(axiom)
+    writer.bools([True, False, True, True, False, False, False, False, True])
+    first = writer.take()
+    reader.feed(first)
+    assert reader.node() == node
+    assert reader.axiom() == axiom
+    assert reader.bools() == [True, False, True, True, False, False, False, False, True]
+    
+    # The names are only sent the first time
+    writer.node(node)
+    second = writer.take()
+    assert len(second) < len(first) and b"A" not in second
+    reader.feed(second)
+    assert reader.node() == node
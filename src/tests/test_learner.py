@@ -1,15 +1,37 @@
 import pytest
 import owlready2
+import asyncio
+import json
+import os
+import time
+import copy
 
 from src.tests.expression_parser import expr
 from src.data.special import RightTerminology, LeftTerminology
 from src.engine.engine_impl import OwlEngine
+from src.engine.el_engine import ElEngine
 
 from src.tests.teacher_mock import MockTeacher
 
-from src.learner.learner_impl import LearnerImpl
+from src.learner.learner_impl import LearnerImpl, Saturation
+from src.learner.instrumentation import Instrumentation, InstrumentedEngine
+from src.learner.checkpoint import answers_path, load_checkpoint
+from src.learner.budget import Budget
+from src.learner.async_learner import AsyncLearner
+from src.teacher.async_teacher import ThreadPoolTeacher
+from src.teacher.teacher_impl import OwlTeacher
+from src.teacher.cache import CachingTeacher
+from src.data.taxonomy import ConceptTaxonomy
 
-from src.data.communication import ConceptExpression
+from src.data.communication import ConceptExpression, InclusionAxiom
+
+ANIMALS = os.path.join(os.path.dirname(__file__), "..", "..", "example", "animals.owl")
+
+@pytest.fixture
+def teacher():
+    teacher = OwlTeacher.load(ANIMALS)
+    yield teacher
+    teacher.ontology.destroy()
 
 @pytest.fixture(autouse=True)
 def run_around_tests():
@@ -151,6 +173,23 @@ def test_left_decomposition():
         
     assert axiom == LeftTerminology(expr({"hasChild": ["Human"]}), ConceptExpression("Human"))
 
+def test_left_decomposition_removes_consecutive_edges():
+    """Removing an edge moves the next one to its index, so it has to be tried there too
+    """
+    teacher_engine = ElEngine()
+    teacher = MockTeacher(teacher_engine, [ConceptExpression("Cat"), ConceptExpression("Human")])
+    
+    engine = ElEngine()
+    learner = LearnerImpl(engine, teacher)
+    
+    teacher_engine.add_axiom(LeftTerminology(expr({"hasChild": ["Human"]}), ConceptExpression("Human")))
+    
+    counter_example = LeftTerminology(expr({"hasParent": []}, {"hasPet": []}, {"hasChild": ["Human"]}), ConceptExpression("Human"))
+    
+    axiom = learner.decompose_left(counter_example)
+    
+    assert axiom == LeftTerminology(expr({"hasChild": ["Human"]}), ConceptExpression("Human"))
+
 def test_sibling_merge():
     onto = owlready2.get_ontology("http://test-teacher.org/onto.owl")
     teacher_engine = OwlEngine(onto)
@@ -167,4 +206,266 @@ def test_sibling_merge():
     
     axiom = learner.sibling_merge(counter_example)
     
-    assert target_axiom == axiom
\ No newline at end of file
+    assert target_axiom == axiom
+
+@pytest.mark.parametrize("saturation", [Saturation.BATCHED, Saturation.GROUP])
+def test_block_saturation(saturation: Saturation):
+    """Batched and group saturation should give the same result as the sequential one
+    """
+    teacher_engine = ElEngine()
+    teacher = MockTeacher(teacher_engine, [ConceptExpression("Human"), ConceptExpression("Dog"), ConceptExpression("Male"), ConceptExpression("Cat")])
+    
+    engine = ElEngine()
+    learner = LearnerImpl(engine, teacher, saturation)
+    
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Human"), expr({"hasParent": ["Human"]}, {"hasFather": ["Human", "Male"]})))
+    teacher_engine.add_axiom(LeftTerminology(expr({"hasParent": []}), ConceptExpression("Human")))
+    engine.add_axiom(LeftTerminology(expr({"hasParent": []}), ConceptExpression("Human")))
+    teacher_engine.add_axiom(LeftTerminology(expr({"hasChild": ["Human"]}), ConceptExpression("Human")))
+    
+    counter_example = RightTerminology(ConceptExpression("Human"), expr({"hasParent": [{"hasParent": []}]}, {"hasFather": []}))
+    axiom = learner.saturate_right(counter_example)
+    
+    assert axiom == RightTerminology(ConceptExpression("Human"), expr({"hasParent": ["Human", {"hasParent": ["Human"]}]}, {"hasFather": ["Human", "Male"]}))
+    
+    counter_example = LeftTerminology(expr({"hasChild": [{"hasParent": []}]}), ConceptExpression("Human"))
+    axiom = learner.saturate_left(counter_example)
+    
+    assert axiom == LeftTerminology(expr({"hasChild": [{"hasParent": []}, "Human"]}), ConceptExpression("Human"))
+
+@pytest.mark.parametrize("saturation", [Saturation.SEQUENTIAL, Saturation.BATCHED, Saturation.GROUP])
+def test_taxonomy_saturation(saturation: Saturation):
+    """Saturation with a taxonomy should give the same result with fewer membership queries. Batched
+    saturation asks about every candidate at once, so it can not skip any.
+    """
+    concepts = [ConceptExpression(c) for c in ["Human", "Poodle", "Beagle", "Mammal", "Dog", "Animal"]]
+    teacher_engine = ElEngine()
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Human"), expr("Mammal", {"hasParent": ["Human"]})))
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Poodle"), expr("Dog")))
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Beagle"), expr("Dog")))
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Dog"), expr("Mammal")))
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Mammal"), expr("Animal")))
+    
+    results = []
+    queries = []
+    for taxonomy in [None, ConceptTaxonomy.from_engine(teacher_engine, concepts)]:
+        teacher = MockTeacher(teacher_engine, concepts)
+        count = [0]
+        asked = []
+        membership_query = teacher.membership_query
+        def counting_query(axiom):
+            count[0] += 1
+            asked.append(copy.deepcopy(axiom))
+            return membership_query(axiom)
+        teacher.membership_query = counting_query
+        
+        learner = LearnerImpl(ElEngine(), teacher, saturation, taxonomy=taxonomy)
+        results.append(learner.saturate_right(RightTerminology(ConceptExpression("Human"), expr({"hasParent": []}))))
+        queries.append(count[0])
+    
+    assert results[0] == RightTerminology(ConceptExpression("Human"), expr("Mammal", "Animal", {"hasParent": ["Human", "Mammal", "Animal"]}))
+    assert results[0] == results[1]
+    if saturation == Saturation.BATCHED:
+        assert queries[1] == queries[0]
+    else:
+        assert queries[1] < queries[0]
+        # Once Dog fails, the concepts below it are not tried any more
+        assert not any(ConceptExpression("Poodle") in n.labels and ConceptExpression("Dog") not in n.labels for a in asked for n in a.right)
+
+def test_terminology_counter_example():
+    """A counter example with complex expressions on both sides should be turned into a terminology
+    """
+    teacher_engine = ElEngine()
+    teacher = MockTeacher(teacher_engine, [ConceptExpression("Human"), ConceptExpression("Dog"), ConceptExpression("Male")])
+    teacher_engine.add_axiom(RightTerminology(ConceptExpression("Human"), expr({"hasParent": ["Human"]})))
+    teacher_engine.add_axiom(LeftTerminology(expr("Male", {"hasParent": []}), ConceptExpression("Human")))
+    
+    learner = LearnerImpl(ElEngine(), teacher, batch_size=2)
+    
+    counter_example = InclusionAxiom(expr("Male", {"hasParent": []}), expr({"hasParent": []}, {"hasParent": ["Human"]}))
+    axiom = learner._terminology_counter_example(counter_example)
+    
+    assert axiom == RightTerminology(ConceptExpression("Human"), expr({"hasParent": []}, {"hasParent": ["Human"]}))
+    
+    counter_example = InclusionAxiom(expr("Male", {"hasParent": []}), expr({"hasChild": []}, {"hasParent": []}))
+    axiom = learner._terminology_counter_example(counter_example)
+    
+    assert axiom == LeftTerminology(expr("Male", {"hasParent": []}), ConceptExpression("Human"))
+
+def test_instrumentation_recursive_phase():
+    """A phase entered again inside itself should only be timed once
+    """
+    instrumentation = Instrumentation()
+    
+    def recurse(depth: int):
+        with instrumentation.phase("decompose_right"):
+            time.sleep(0.05)
+            if depth > 0:
+                recurse(depth - 1)
+    
+    start = time.perf_counter()
+    recurse(3)
+    elapsed = time.perf_counter() - start
+    
+    stats = instrumentation.phases["decompose_right"]
+    assert stats.calls == 4
+    assert 0.2 <= stats.seconds <= elapsed
+
+def test_instrumentation(teacher: OwlTeacher, tmp_path):
+    path = str(tmp_path / "report.json")
+    instrumentation = Instrumentation(path)
+    calls = []
+    instrumentation.add_hook(lambda phase, operation, items, seconds: calls.append((phase, operation)))
+    
+    learner = LearnerImpl(ElEngine(), teacher, instrumentation=instrumentation)
+    hypothesis = learner.run_learner()
+    
+    assert teacher.equivalence_query(hypothesis) == None
+    
+    with open(path) as f:
+        report = json.load(f)
+    
+    phases = report["phases"]
+    assert phases["learner"]["operations"]["equivalence_query"]["calls"] == phases["learner"]["operations"]["add_axiom"]["calls"] + 1
+    assert phases["saturate_right"]["operations"]["membership_query"]["calls"] > 0
+    assert ("decompose_left", "entails") in calls
+
+def test_instrumented_engine_close():
+    class ClosingEngine(ElEngine):
+        closed = False
+        def close(self):
+            self.closed = True
+    
+    engine = ClosingEngine()
+    InstrumentedEngine(engine, Instrumentation()).close()
+    assert engine.closed
+    
+    # Engines without anything to close are fine too
+    InstrumentedEngine(ElEngine(), Instrumentation()).close()
+
+def test_checkpoint(teacher: OwlTeacher, tmp_path):
+    path = str(tmp_path / "run.ckpt")
+    
+    class Crash(Exception):
+        pass
+    
+    equivalence_query = teacher.equivalence_query
+    calls = [0]
+    def crashing_query(axioms):
+        calls[0] += 1
+        if calls[0] > 5:
+            raise Crash()
+        return equivalence_query(axioms)
+    teacher.equivalence_query = crashing_query
+    
+    learner = LearnerImpl(ElEngine(), teacher, checkpoint=path)
+    with pytest.raises(Crash):
+        learner.run_learner()
+    teacher.equivalence_query = equivalence_query
+    
+    checkpoint = load_checkpoint(path)
+    assert checkpoint.counter_examples == 5
+    assert [a.inclusion_axiom() for a in checkpoint.hypothesis] == learner._get_hypothesis()
+    
+    resumed = LearnerImpl.resume(path, teacher, ElEngine())
+    assert resumed.cache != None
+    known = len(resumed.cache.answers)
+    assert known > 0
+    hypothesis = resumed.run_learner()
+    
+    assert teacher.equivalence_query(hypothesis) == None
+    assert resumed.cache.hits > 0
+    assert load_checkpoint(path).counter_examples > 5
+    assert len(CachingTeacher(teacher, answers_path(path)).answers) == known + resumed.cache.misses
+
+def test_checkpoint_budget(teacher: OwlTeacher, tmp_path):
+    """A run stopped by the budget saves the hypothesis after the last counter example it finished
+    """
+    for limit in range(10, 200, 7):
+        path = str(tmp_path / f"{limit}.ckpt")
+        steps = list(LearnerImpl(ElEngine(), teacher, checkpoint=path).iter_learner(Budget(membership_queries=limit)))
+        
+        checkpoint = load_checkpoint(path)
+        assert checkpoint.counter_examples == steps[-1].counter_examples
+        assert all(teacher.membership_query(a.inclusion_axiom()) for a in checkpoint.hypothesis)
+
+def test_iter_learner(teacher: OwlTeacher):
+    steps = list(LearnerImpl(ElEngine(), teacher).iter_learner())
+    
+    assert [p.counter_examples for p in steps[:-1]] == list(range(1, len(steps)))
+    assert steps[-1].finished and steps[-1].stopped == None
+    assert teacher.equivalence_query(steps[-1].hypothesis) == None
+    
+    steps = list(LearnerImpl(ElEngine(), teacher).iter_learner(Budget(equivalence_queries=3)))
+    
+    assert steps[-1].stopped == "equivalence_queries"
+    assert steps[-1].equivalence_queries == 3
+    assert steps[-1].counter_examples == 3
+    
+    steps = list(LearnerImpl(ElEngine(), teacher).iter_learner(Budget(membership_queries=50)))
+    
+    assert steps[-1].stopped == "membership_queries"
+    assert not steps[-1].finished
+    assert steps[-1].membership_queries <= 50
+    
+    # A run that stops in the middle of a counter example keeps the hypothesis it had before it
+    for limit in range(10, 200, 7):
+        steps = list(LearnerImpl(ElEngine(), teacher).iter_learner(Budget(membership_queries=limit)))
+        assert all(teacher.membership_query(a) for a in steps[-1].hypothesis)
+    
+    steps = list(LearnerImpl(ElEngine(), teacher).iter_learner(Budget(seconds=0)))
+    
+    assert len(steps) == 1 and steps[0].stopped == "seconds" and steps[0].hypothesis == []
+
+class SlowTeacher:
+    """An AsyncTeacher that takes a moment for each membership query, and tracks how many are in flight
+    """
+    def __init__(self, teacher: OwlTeacher):
+        self.teacher = teacher
+        self.in_flight = 0
+        self.max_in_flight = 0
+    
+    async def membership_query(self, axiom):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.0001)
+        self.in_flight -= 1
+        return self.teacher.membership_query(axiom)
+    
+    async def membership_queries(self, axioms):
+        return list(await asyncio.gather(*(self.membership_query(a) for a in axioms)))
+    
+    async def equivalence_query(self, axioms):
+        return self.teacher.equivalence_query(axioms)
+    
+    def get_concepts(self):
+        return self.teacher.get_concepts()
+
+def test_async_learner(teacher: OwlTeacher):
+    slow = SlowTeacher(teacher)
+    hypothesis = asyncio.run(AsyncLearner(ElEngine(), slow).run_learner())
+    
+    assert teacher.equivalence_query(hypothesis) == None
+    assert slow.max_in_flight > 1
+    
+    # Speculation only changes how the queries are asked
+    expected = LearnerImpl(ElEngine(), teacher).run_learner()
+    assert {a.canonical() for a in hypothesis} == {a.canonical() for a in expected}
+
+def test_thread_pool_teacher(teacher: OwlTeacher):
+    pool = ThreadPoolTeacher(teacher)
+    
+    async def run():
+        steps = [p async for p in AsyncLearner(ElEngine(), pool).iter_learner()]
+        assert await pool.membership_queries([]) == []
+        return steps
+    
+    steps = asyncio.run(run())
+    pool.close()
+    
+    # Saturation is batched unless asked otherwise
+    assert AsyncLearner(ElEngine(), pool).learner.saturation == Saturation.BATCHED
+    assert AsyncLearner(ElEngine(), pool, saturation=Saturation.GROUP).learner.saturation == Saturation.GROUP
+    
+    assert steps[-1].finished
+    assert teacher.equivalence_query(steps[-1].hypothesis) == None
@@ -0,0 +1,72 @@
+import pytest
+import owlready2
+
+from src.tests.expression_parser import expr
+from src.data.special import RightTerminology, LeftTerminology
+from src.data.communication import ConceptExpression, InclusionAxiom
+from src.engine.el_engine import ElEngine
+from src.engine.engine_impl import OwlEngine
+from src.engine.structural import StructuralEngine, simulates
+
+def test_simulates():
+    sub = expr("A", "B", {"r": ["C", {"s": ["D"]}]}, {"r": ["E"]})
+
+    assert simulates(sub.canonical(), expr().canonical())
+    assert simulates(sub.canonical(), expr("A", {"r": [{"s": []}]}, {"r": ["E"]}).canonical())
+    assert not simulates(sub.canonical(), expr({"r": ["C", "E"]}).canonical())
+    assert not simulates(sub.canonical(), expr({"s": []}).canonical())
+
+def test_structural_engine():
+    engine = StructuralEngine(ElEngine(), closed=True)
+
+    # With an empty hypothesis every query is answered without the engine
+    assert engine.entails(InclusionAxiom(expr("A", {"r": ["B"]}), expr({"r": []})))
+    assert not engine.entails(RightTerminology(ConceptExpression("A"), expr("B")))
+    assert engine.hits == 2 and engine.misses == 0
+
+    # A ⊑ B ⊓ ∃r.C
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("B", {"r": ["C"]})))
+
+    # Nothing in the hypothesis gives D or an s edge
+    assert not engine.entails(RightTerminology(ConceptExpression("A"), expr("D")))
+    assert not engine.entails(RightTerminology(ConceptExpression("A"), expr({"s": []})))
+    assert engine.hits == 4
+
+    assert engine.entails_many([
+        RightTerminology(ConceptExpression("A"), expr("B", {"r": []})),
+        LeftTerminology(expr("A", {"s": []}), ConceptExpression("B")),
+        RightTerminology(ConceptExpression("C"), expr("B")),
+    ]) == [True, True, False]
+    assert engine.hits == 4 and engine.misses == 3
+    assert engine.hit_rate == 4 / 7
+
+def test_structural_engine_replaced_right():
+    """A replaced right terminology is still used by the wrapped engine, so its labels still count
+    """
+    engine = StructuralEngine(ElEngine(), closed=True)
+
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("B")))
+    engine.add_axiom(RightTerminology(ConceptExpression("A"), expr("C")))
+
+    assert engine.entails(RightTerminology(ConceptExpression("A"), expr("B")))
+    assert engine.entails(RightTerminology(ConceptExpression("A"), expr("C")))
+
+def test_structural_engine_open():
+    """An OwlEngine also reasons with what is already in its ontology, so only the shape of the axiom
+    can be used
+    """
+    onto = owlready2.get_ontology("http://test-structural.org/onto.owl")
+    with onto:
+        class B(owlready2.Thing):
+            pass
+        class A(B):
+            pass
+
+    engine = StructuralEngine(OwlEngine(onto))
+
+    assert engine.entails(RightTerminology(ConceptExpression("A"), expr("B")))
+    assert not engine.entails(RightTerminology(ConceptExpression("B"), expr("A")))
+    assert engine.entails(InclusionAxiom(expr("A", "B"), expr("B")))
+    assert engine.hits == 1 and engine.misses == 2
+
+    onto.destroy()
@@ -0,0 +1,103 @@
+import pytest
+import os
+
+from src.tests.expression_parser import expr
+from src.data.special import RightTerminology
+from src.data.communication import ConceptExpression, InclusionAxiom
+from src.engine.el_engine import ElEngine
+from src.learner.learner_impl import LearnerImpl
+from src.teacher.teacher_impl import OwlTeacher
+from src.teacher.pool import PoolTeacher
+from src.teacher.socket_teacher import SocketTeacher, TeacherServer
+
+ANIMALS = os.path.join(os.path.dirname(__file__), "..", "..", "example", "animals.owl")
+
+@pytest.fixture
+def teacher():
+    teacher = OwlTeacher.load(ANIMALS)
+    yield teacher
+    teacher.ontology.destroy()
+
+def test_load(teacher: OwlTeacher):
+    assert len(teacher.axioms) == 15
+    assert len(teacher.unsupported) == 0
+    assert ConceptExpression("Bird") in teacher.get_concepts()
+
+def test_membership_query(teacher: OwlTeacher):
+    # Bird ⊑ Animal ⊓ ∃.has_part.Backbone
+    assert teacher.membership_query(InclusionAxiom(expr("Bird"), expr("Animal", {"has_part": ["Backbone"]})))
+    # Animal ⊓ ∃.eats.Meat ⊑ Carnivore
+    assert teacher.membership_query(InclusionAxiom(expr("Animal", {"eats": ["Meat"]}), expr("Carnivore")))
+    # not Animal ⊑ Carnivore
+    assert not teacher.membership_query(InclusionAxiom(expr("Animal"), expr("Carnivore")))
+
+def test_equivalence_query(teacher: OwlTeacher):
+    counter_example = teacher.equivalence_query([])
+    assert counter_example in teacher.axioms
+    assert counter_example is not teacher.axioms[0]
+    
+    hypothesis = [RightTerminology(ConceptExpression("Bird"), expr("Vertebrate")).inclusion_axiom()]
+    assert teacher.equivalence_query(hypothesis) != InclusionAxiom(expr("Bird"), expr("Vertebrate"))
+
+def test_learn_target(teacher: OwlTeacher):
+    learner = LearnerImpl(ElEngine(), teacher)
+    
+    hypothesis = learner.run_learner()
+    
+    assert teacher.equivalence_query(hypothesis) == None
+
+def test_learn_target_compact(teacher: OwlTeacher):
+    engine = ElEngine()
+    learner = LearnerImpl(engine, teacher, compact_every=1)
+    
+    hypothesis = learner.run_learner()
+    
+    assert teacher.equivalence_query(hypothesis) == None
+    assert len(engine.axioms) == len(hypothesis)
+
+def test_pool_teacher(teacher: OwlTeacher):
+    pool = PoolTeacher(ANIMALS, processes=2)
+    
+    axioms = [
+        InclusionAxiom(expr("Bird"), expr("Animal", {"has_part": ["Backbone"]})),
+        InclusionAxiom(expr("Animal"), expr("Carnivore")),
+        InclusionAxiom(expr("Animal", {"eats": ["Meat"]}), expr("Carnivore")),
+    ]
+    
+    assert pool.membership_queries(axioms) == [True, False, True]
+    assert pool.membership_queries(axioms) == teacher.membership_queries(axioms)
+    assert pool.membership_queries([]) == []
+    
+    pool.close()
+
+def test_taxonomy(teacher: OwlTeacher):
+    taxonomy = teacher.get_taxonomy()
+    
+    assert taxonomy.subsumers(ConceptExpression("Cat")) == {ConceptExpression(c) for c in ["Animal", "Carnivore", "Mammal", "Vertebrate"]}
+    assert ConceptExpression("Bird") in taxonomy.subsumees(ConceptExpression("Vertebrate"))
+    assert taxonomy.order(teacher.get_concepts())[0] not in taxonomy.subsumees(ConceptExpression("Animal"))
+    
+    learner = LearnerImpl(ElEngine(), teacher, taxonomy=taxonomy)
+    assert teacher.equivalence_query(learner.run_learner()) == None
+
+def test_socket_teacher(teacher: OwlTeacher, tmp_path):
+    server = TeacherServer(teacher, str(tmp_path / "teacher.sock"))
+    server.start()
+    client = SocketTeacher(server.address, batch_size=2)
+    
+    axioms = [
+        InclusionAxiom(expr("Bird"), expr("Animal", {"has_part": ["Backbone"]})),
+        InclusionAxiom(expr("Animal", {"eats": ["Meat"]}), expr("Carnivore")),
+        InclusionAxiom(expr("Animal"), expr("Carnivore")),
+    ]
+    assert client.membership_queries(axioms) == [True, True, False]
+    assert not client.membership_query(axioms[2])
+    assert client.get_concepts() == teacher.get_concepts()
+    assert client.equivalence_query(teacher.axioms) == None
+    
+    hypothesis = LearnerImpl(ElEngine(), client).run_learner()
+    assert teacher.equivalence_query(hypothesis) == None
+    
+    client.close()
+    server.close()
+    assert not os.path.exists(server.address)